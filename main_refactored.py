@@ -682,12 +682,16 @@ class MaiMaiLauncher:
                 ui.components.show_title("组件下载中心", symbol="📥")
                 
                 # 显示组件选择菜单
-                component_key = component_manager.show_component_download_menu()
-                if not component_key:
+                component_keys = component_manager.show_component_download_menu()
+                if not component_keys:
                     break
                 
-                # 执行组件下载
-                success = component_manager.download_component(component_key)
+                # 执行组件下载，选择了多个组件时先并行下载安装包再逐个安装
+                if len(component_keys) == 1:
+                    success = component_manager.download_component(component_keys[0])
+                else:
+                    results = component_manager.download_multiple_components(component_keys)
+                    success = all(results.values())
                 if success:
                     ui.print_success(f"组件下载完成！")
                 else:
@@ -11,6 +11,8 @@ import sys
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from src.utils.common import write_text_atomic
+
 try:
     from src.utils.proxy_manager import proxy_manager
     PROXY_AVAILABLE = True
@@ -39,8 +41,7 @@ def load_config():
 def save_config(data):
     # 这里只做示例，实际应使用toml库写回
     import toml
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        toml.dump(data, f)
+    write_text_atomic(CONFIG_PATH, toml.dumps(data))
 
 def load_ui_json():
     if not os.path.exists(JSON_PATH):
@@ -49,8 +50,8 @@ def load_ui_json():
         return json.load(f)
 
 def save_ui_json(data):
-    with open(JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 先整体编码再一次写入，json.dump 会按片段逐次调用 write
+    write_text_atomic(JSON_PATH, json.dumps(data, ensure_ascii=False, indent=2))
 
 def sync_ui_json_with_toml():
     config = load_config()
@@ -67,8 +68,10 @@ def sync_ui_json_with_toml():
                 "serial_number": i.get("serial_number"),
                 "nickname_path": i.get("nickname_path")
             })
-    ui_json["instances"] = new_instances
-    save_ui_json(ui_json)
+    # 实例列表没有变化时不再重写文件；首次运行文件尚不存在时仍需创建
+    if new_instances != ui_json["instances"] or not os.path.exists(JSON_PATH):
+        ui_json["instances"] = new_instances
+        save_ui_json(ui_json)
 
 @app.get("/api/configs")
 def get_configs():
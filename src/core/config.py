@@ -7,6 +7,8 @@ import toml
 import structlog
 from typing import Dict, Any, Optional
 
+from ..utils.common import write_text_atomic
+
 logger = structlog.get_logger(__name__)
 
 
@@ -73,8 +75,8 @@ class Config:
     def save(self) -> bool:
         """保存配置文件"""
         try:
-            with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
-                toml.dump(self.config, f)
+            # 先完整编码再原子替换，写入中断不会损坏配置文件
+            write_text_atomic(self.CONFIG_FILE, toml.dumps(self.config))
             logger.info("配置文件保存成功")
             return True
         except Exception as e:
@@ -4,24 +4,55 @@
 负责独立下载和安装各种开发组件
 """
 
-from .component_manager import ComponentManager
-from .nodejs_downloader import NodeJSDownloader
-from .vscode_downloader import VSCODEDownloader
-from .git_downloader import GitDownloader
-from .go_downloader import GoDownloader
-from .python_downloader import PythonDownloader
-from .mongodb_downloader import MongoDBDownloader
-from .sqlitestudio_downloader import SQLiteStudioDownloader
-from .napcat_downloader import NapCatDownloader
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .component_manager import ComponentManager
+    from .nodejs_downloader import NodeJSDownloader
+    from .vscode_downloader import VSCODEDownloader
+    from .git_downloader import GitDownloader
+    from .go_downloader import GoDownloader
+    from .python_downloader import PythonDownloader
+    from .mongodb_downloader import MongoDBDownloader
+    from .sqlitestudio_downloader import SQLiteStudioDownloader
+    from .napcat_downloader import NapCatDownloader
+
+# 导出名称 -> 所在子模块，首次访问时才导入对应下载器
+_LAZY_EXPORTS = {
+    'ComponentManager': '.component_manager',
+    'NodeJSDownloader': '.nodejs_downloader',
+    'VSCODEDownloader': '.vscode_downloader',
+    'GitDownloader': '.git_downloader',
+    'GoDownloader': '.go_downloader',
+    'PythonDownloader': '.python_downloader',
+    'MongoDBDownloader': '.mongodb_downloader',
+    'SQLiteStudioDownloader': '.sqlitestudio_downloader',
+    'NapCatDownloader': '.napcat_downloader',
+}
 
 __all__ = [
     'ComponentManager',
     'NodeJSDownloader',
-    'VSCODEDownloader', 
+    'VSCODEDownloader',
     'GitDownloader',
     'GoDownloader',
     'PythonDownloader',
     'MongoDBDownloader',
     'SQLiteStudioDownloader',
     'NapCatDownloader'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """按需导入下载器（PEP 562），避免导入包时加载全部下载器及其依赖"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
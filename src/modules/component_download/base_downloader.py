@@ -4,27 +4,258 @@
 为所有组件下载器提供通用功能
 """
 
+import hashlib
+import logging
+import mmap
 import os
-import requests
+import platform
+import random
+import shutil
+import struct
 import subprocess
+import sys
 import tempfile
-import zipfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, ClassVar, Dict, Optional, Tuple
 import structlog
-from tqdm import tqdm
 
 from ...ui.interface import ui
 
+# requests/tqdm/zipfile 等只在真正下载、解压时才导入，
+# 仅检查安装状态或显示菜单时不必承担这些模块的导入开销
+if TYPE_CHECKING:
+    import requests
+    import tarfile
+    import zipfile
+    from tqdm import tqdm
+
 logger = structlog.get_logger(__name__)
 
 
+def _debug_enabled() -> bool:
+    """DEBUG 级别未启用时返回False，调用方据此跳过日志事件字典的构造"""
+    is_enabled_for = getattr(logger, "isEnabledFor", None)
+    # 未接入标准库 logging 时无法判断，按已启用处理
+    return is_enabled_for(logging.DEBUG) if is_enabled_for else True
+
+
+def _normalize_arch(machine: str) -> str:
+    """标准化架构名称，只区分 x86_64 和 arm64"""
+    if machine in ('arm64', 'aarch64'):
+        return 'arm64'
+    return 'x86_64'
+
+
+# 平台信息在进程生命周期内不变，导入时计算一次供所有下载器共享
+SYSTEM = platform.system().lower()
+ARCH = _normalize_arch(platform.machine().lower())
+
+
+def _create_session() -> "requests.Session":
+    """创建带连接池的会话，复用同一主机的TCP/TLS连接"""
+    import ssl
+    import certifi
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    class _SharedSSLAdapter(HTTPAdapter):
+        """所有连接共用同一个已加载证书库的 SSLContext，证书库只在创建时解析一次
+        
+        requests 会把证书库路径交给 urllib3，urllib3 每建立一个新连接都会对 SSLContext
+        重新调用 load_verify_locations，因此使用默认证书库时去掉路径，只按 SSLContext 校验；
+        指定了其他证书库（verify 参数、REQUESTS_CA_BUNDLE 等）或关闭校验时不使用共享的
+        SSLContext，交由 requests/urllib3 按原有方式处理
+        """
+        
+        def __init__(self, ssl_context: ssl.SSLContext, ca_bundle: str, **kwargs):
+            self._ssl_context = ssl_context
+            self._ca_bundle = ca_bundle
+            super().__init__(**kwargs)
+        
+        def _uses_default_bundle(self, verify) -> bool:
+            return verify is True or verify == self._ca_bundle
+        
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs['ssl_context'] = self._ssl_context
+            return super().init_poolmanager(*args, **kwargs)
+        
+        def proxy_manager_for(self, proxy, **proxy_kwargs):
+            # 设置了 HTTPS_PROXY 等代理时连接池由代理管理器创建，同样需要共享的 SSLContext
+            if proxy not in self.proxy_manager:
+                proxy_kwargs.setdefault('ssl_context', self._ssl_context)
+            return super().proxy_manager_for(proxy, **proxy_kwargs)
+        
+        def cert_verify(self, conn, url, verify, cert):
+            super().cert_verify(conn, url, verify, cert)
+            if not url.lower().startswith('https'):
+                return
+            if self._uses_default_bundle(verify):
+                conn.conn_kw['ssl_context'] = self._ssl_context
+                conn.ca_certs = None
+                conn.ca_cert_dir = None
+            else:
+                # 不能向共享的 SSLContext 加载其他证书或修改其校验模式
+                conn.conn_kw.pop('ssl_context', None)
+        
+        def build_connection_pool_key_attributes(self, request, verify, cert=None):
+            # requests 2.32 起还会通过连接池参数传入证书库路径
+            host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+            if self._uses_default_bundle(verify):
+                pool_kwargs.pop('ca_certs', None)
+                pool_kwargs.pop('ca_cert_dir', None)
+            return host_params, pool_kwargs
+    
+    ca_bundle = certifi.where()
+    session = requests.Session()
+    session.verify = ca_bundle
+    adapter = _SharedSSLAdapter(
+        ssl.create_default_context(cafile=ca_bundle),
+        ca_bundle,
+        pool_connections=8,
+        pool_maxsize=16,
+        max_retries=Retry(total=0),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_shared_session: Optional["requests.Session"] = None
+_shared_session_lock = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    """获取所有下载器共享的会话，首次调用时才创建"""
+    global _shared_session
+    if _shared_session is None:
+        # 预下载时多个线程可能同时首次访问
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = _create_session()
+    return _shared_session
+
+
+class _ZipStreamReader:
+    """从HTTP响应按需读取数据，读到的原始字节同时写入文件、更新摘要和进度条"""
+    
+    def __init__(self, raw, file, hasher, progress_bar, chunk_size: int):
+        self._raw = raw
+        self._file = file
+        self._hasher = hasher
+        self._progress_bar = progress_bar
+        self._chunk_size = chunk_size
+        self._buffer = b''
+        self._pos = 0
+    
+    def _fill(self) -> bool:
+        """再读取一块数据到缓冲区，响应已读完时返回False"""
+        chunk = self._raw.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._file.write(chunk)
+        if self._hasher is not None:
+            self._hasher.update(chunk)
+        self._progress_bar.update(len(chunk))
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+    
+    def read_exact(self, size: int) -> bytes:
+        """读取恰好 size 字节，数据不足时抛出 EOFError"""
+        while len(self._buffer) - self._pos < size:
+            if not self._fill():
+                raise EOFError("压缩包数据不完整")
+        data = self._buffer[self._pos:self._pos + size]
+        self._pos += size
+        return data
+    
+    def read_some(self, size: int) -> bytes:
+        """读取最多 size 字节，响应已读完时返回空字节串"""
+        if self._pos >= len(self._buffer) and not self._fill():
+            return b''
+        data = self._buffer[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+    
+    def unread(self, data: bytes):
+        """退回上一次 read_some 结果末尾未使用的部分"""
+        self._pos -= len(data)
+    
+    def drain(self):
+        """读完剩余的响应数据（只写入文件，不再解析）"""
+        self._buffer = b''
+        self._pos = 0
+        while self._fill():
+            self._buffer = b''
+
+
+class _MmapFile:
+    """把只读 mmap 包装成 zipfile 可用的文件对象，成员数据直接从页缓存读取"""
+    
+    def __init__(self, mm: mmap.mmap):
+        self._mm = mm
+    
+    def read(self, size: int = -1) -> bytes:
+        return self._mm.read(None if size is None or size < 0 else size)
+    
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._mm.seek(offset, whence)
+        return self._mm.tell()
+    
+    def tell(self) -> int:
+        return self._mm.tell()
+    
+    def seekable(self) -> bool:
+        return True
+
+
 class BaseDownloader:
     """基础下载器类"""
     
+    # 本次运行中已完成的下载：保存路径 -> 下载链接
+    _completed_downloads: ClassVar[Dict[str, str]] = {}
+    
+    # 分段下载配置：小于阈值的文件直接单连接下载
+    PARALLEL_THRESHOLD = 8 * 1024 * 1024
+    PARALLEL_CONNECTIONS = 4
+    # 单个分段失败后的重试次数，用尽后整体回退到单连接下载
+    SEGMENT_MAX_RETRIES = 3
+    
+    # 文件读写缓冲区大小
+    CHUNK_SIZE = 1024 * 1024
+    
+    # 成员数达到阈值的zip包多线程解压（zlib解压时会释放GIL）
+    PARALLEL_EXTRACT_MIN_MEMBERS = 10
+    PARALLEL_EXTRACT_MAX_WORKERS = 8
+    
+    # zip中Deflate64的压缩方法编号，标准库 zipfile 不支持
+    ZIP_DEFLATE64 = 9
+    
+    # 进度条累计到该字节数才更新一次，刷新频率限制为每秒4次
+    PROGRESS_UPDATE_BYTES = 1024 * 1024
+    PROGRESS_MIN_INTERVAL = 0.25
+    
+    # 重试等待时间：指数退避加随机抖动，单次最长等待秒数
+    RETRY_BACKOFF_BASE = 0.5
+    RETRY_BACKOFF_MAX = 8
+    
     def __init__(self, name: str):
         self.name = name
         self.temp_dir = None
+        # 多个下载器并行下载时由调用方设置：进度条固定在终端的第几行、单个文件的分段连接数
+        self.progress_position: Optional[int] = None
+        self.parallel_connections = self.PARALLEL_CONNECTIONS
+    
+    @property
+    def _session(self) -> "requests.Session":
+        """所有下载器共享同一个会话"""
+        return _get_session()
     
     def __enter__(self):
         """上下文管理器入口"""
@@ -36,82 +267,429 @@ class BaseDownloader:
         if self.temp_dir:
             self.temp_dir.cleanup()
     
-    def download_file(self, url: str, filename: str, max_retries: int = 3) -> bool:
-        """下载文件并显示进度，支持重试"""
-        try:
-            # 检查网络连接
-            response = requests.head(url, timeout=10, verify=False)
-            if response.status_code >= 400:
-                ui.print_error(f"URL无效或文件不存在: {url}")
-                return False
-        except requests.RequestException as e:
-            ui.print_error(f"网络连接失败: {str(e)}")
-            return False
+    def _print(self, level: str, message: str):
+        """输出下载提示；设置了 progress_position 时经 tqdm.write 串行输出，不打乱其他进度条"""
+        if self.progress_position is None:
+            getattr(ui, f"print_{level}")(message)
+            return
+        from tqdm import tqdm
+        
+        tqdm.write(f"{ui.symbols[level]} {message}")
+    
+    def download_file(self, url: str, filename: str, max_retries: int = 3, sha256: Optional[str] = None) -> bool:
+        """下载文件并显示进度，支持重试；提供 sha256 时在写入过程中同步计算并校验摘要"""
+        import requests
+        
+        log_context = {'url': url, 'filename': filename}
+        expected_sha256 = sha256.lower() if sha256 else None
+        
+        # 已经预下载过的文件不再重复下载
+        if self._completed_downloads.get(filename) == url and os.path.exists(filename):
+            self._print('info', f"{filename} 已下载，跳过")
+            return True
+        
+        # 下载过程中写入临时的 .part 文件，完成后再重命名为目标文件，
+        # 避免中断后残留不完整的安装包，也便于下次断点续传
+        part_file = filename + '.part'
+        
+        # 服务器支持Range且文件较大时优先分段并行下载（已有未完成的下载时直接续传）；
+        # 探测用的就是第一个Range请求，小文件直接沿用该响应下载，不多一次往返
+        probe_response = None
+        if not os.path.exists(part_file):
+            parallel_size, probe_response = self._probe_range_support(url)
+            if parallel_size >= self.PARALLEL_THRESHOLD:
+                probe_response.close()
+                probe_response = None
+                if self._parallel_download(url, part_file, parallel_size, self.parallel_connections):
+                    # 分段乱序写入，只能在下载完成后读取一遍文件计算摘要
+                    if expected_sha256 and not self._verify_sha256(self._file_sha256(part_file), expected_sha256, part_file):
+                        return False
+                    os.replace(part_file, filename)
+                    self._print('success', f"{filename} 下载完成")
+                    logger.info("文件下载完成", **log_context)
+                    self._completed_downloads[filename] = url
+                    return True
         
         # 重试逻辑
         for retry in range(max_retries):
+            # 从已下载的位置继续，不丢弃已写入的数据
+            resume_from = os.path.getsize(part_file) if os.path.exists(part_file) else 0
+            headers = {'Range': f'bytes={resume_from}-'} if resume_from else None
+            
             try:
-                ui.print_info(f"正在下载 {filename}... (尝试 {retry + 1}/{max_retries})")
-                logger.info("开始下载文件", url=url, filename=filename, retry=retry+1)
-                
-                response = requests.get(url, stream=True, timeout=30, verify=False)
-                response.raise_for_status()
-                
-                total_size = int(response.headers.get('content-length', 0))
+                self._print('info', f"正在下载 {filename}... (尝试 {retry + 1}/{max_retries})")
+                if _debug_enabled():
+                    logger.debug("开始下载文件", retry=retry+1, resume_from=resume_from, **log_context)
                 
-                with open(filename, 'wb') as file, tqdm(
-                    desc=filename,
-                    total=total_size,
-                    unit='iB',
-                    unit_scale=True,
-                    unit_divisor=1024,
-                ) as progress_bar:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            file.write(chunk)
-                            progress_bar.update(len(chunk))
+                # 首次尝试沿用探测请求的响应（即 Range: bytes=0- 的请求）
+                if probe_response is not None:
+                    response, probe_response = probe_response, None
+                else:
+                    response = self._session.get(url, headers=headers, stream=True, timeout=30)
+                with response:
+                    # 续传范围无效（通常是本地文件已损坏），删除后重新下载
+                    if resume_from and response.status_code == 416:
+                        self._print('warning', "断点续传失败，将重新下载完整文件")
+                        os.remove(part_file)
+                        continue
+                    # 客户端错误说明链接无效，重试没有意义
+                    if 400 <= response.status_code < 500:
+                        self._print('error', f"URL无效或文件不存在: {url}")
+                        return False
+                    response.raise_for_status()
+                    
+                    # 服务器返回200表示不支持续传，从头开始写入
+                    if response.status_code != 206:
+                        resume_from = 0
+                    content_length = int(response.headers.get('content-length', 0))
+                    total_size = resume_from + content_length if content_length else 0
+                    # 续传时先补算已下载部分的摘要，其余部分在写入时同步计算
+                    hasher = self._file_sha256_hasher(part_file, resume_from) if expected_sha256 else None
+                    self._write_response(response, part_file, total_size, resume_from, hasher)
                 
                 # 验证文件大小
                 if total_size > 0:
-                    actual_size = os.path.getsize(filename)
+                    actual_size = os.path.getsize(part_file)
                     if actual_size < total_size * 0.98:  # 允许2%的误差
-                        ui.print_warning(f"文件下载不完整: 预期 {total_size} 字节, 实际 {actual_size} 字节")
+                        self._print('warning', f"文件下载不完整: 预期 {total_size} 字节, 实际 {actual_size} 字节")
                         if retry < max_retries - 1:
-                            ui.print_info("将重试下载...")
+                            self._print('info', "将重试下载...")
                             continue
                         else:
-                            ui.print_error("达到最大重试次数，文件可能不完整")
+                            self._print('error', "达到最大重试次数，文件可能不完整")
                             return False
                 
-                ui.print_success(f"{filename} 下载完成")
-                logger.info("文件下载完成", filename=filename)
+                if hasher is not None and not self._verify_sha256(hasher.hexdigest(), expected_sha256, part_file):
+                    return False
+                
+                os.replace(part_file, filename)
+                self._print('success', f"{filename} 下载完成")
+                logger.info("文件下载完成", **log_context)
+                self._completed_downloads[filename] = url
                 return True
                 
             except requests.RequestException as e:
-                ui.print_warning(f"下载失败 (尝试 {retry + 1}/{max_retries}): {str(e)}")
-                logger.warning("文件下载失败", error=str(e), url=url, retry=retry+1)
+                self._print('warning', f"下载失败 (尝试 {retry + 1}/{max_retries}): {str(e)}")
+                logger.warning("文件下载失败", error=str(e), retry=retry+1, **log_context)
                 
                 if retry < max_retries - 1:
-                    ui.print_info("3秒后重试...")
-                    import time
-                    time.sleep(3)
+                    delay = self._retry_delay(retry)
+                    self._print('info', f"{delay:.1f}秒后重试...")
+                    time.sleep(delay)
                     continue
                 else:
-                    ui.print_error("达到最大重试次数，下载失败")
+                    self._print('error', "达到最大重试次数，下载失败")
                     return False
                     
-        ui.print_error(f"下载失败：达到最大重试次数 {max_retries}")
-        logger.error("文件下载失败", url=url)
+        self._print('error', f"下载失败：达到最大重试次数 {max_retries}")
+        logger.error("文件下载失败", **log_context)
+        return False
+    
+    def _file_sha256_hasher(self, filename: str, length: int) -> "hashlib._Hash":
+        """返回已读入文件前 length 字节的 SHA-256 对象"""
+        hasher = hashlib.sha256()
+        if length:
+            with open(filename, 'rb') as file:
+                remaining = length
+                while remaining:
+                    chunk = file.read(min(self.CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    remaining -= len(chunk)
+        return hasher
+    
+    def _file_sha256(self, filename: str) -> str:
+        """计算整个文件的 SHA-256"""
+        return self._file_sha256_hasher(filename, os.path.getsize(filename)).hexdigest()
+    
+    def _verify_sha256(self, actual: str, expected: str, filename: str) -> bool:
+        """校验摘要，不一致时删除文件，避免后续解压或安装损坏的文件"""
+        if actual == expected:
+            return True
+        self._print('error', f"文件校验失败: {os.path.basename(filename)} 的 SHA-256 与发布信息不一致")
+        logger.error("文件SHA-256校验失败", filename=filename, expected=expected, actual=actual)
+        self._discard_partial(filename)
         return False
     
-    def extract_archive(self, archive_path: str, extract_to: str) -> bool:
-        """解压文件"""
+    def _retry_delay(self, attempt: int) -> float:
+        """第 attempt 次（从0开始）失败后的等待秒数：指数退避加全量随机抖动"""
+        return random.uniform(0, min(self.RETRY_BACKOFF_MAX, self.RETRY_BACKOFF_BASE * (2 ** attempt)))
+    
+    def _probe_range_support(self, url: str) -> Tuple[int, Optional["requests.Response"]]:
+        """发送 Range: bytes=0- 请求探测服务器是否支持分段下载
+        
+        返回 (文件大小, 响应)：服务器返回206时文件大小取自 Content-Range，否则为0；
+        响应未读取正文，调用方可直接继续读取或关闭；请求失败时响应为 None
+        """
+        import requests
+        
+        try:
+            response = self._session.get(url, headers={'Range': 'bytes=0-'}, stream=True, timeout=30)
+        except requests.RequestException:
+            return 0, None
+        if response.status_code != 206:
+            return 0, response
+        _, _, total = response.headers.get('content-range', '').rpartition('/')
+        return (int(total) if total.isdigit() else 0), response
+    
+    def _parallel_download(self, url: str, filename: str, total_size: int, n: int = 4) -> bool:
+        """使用多个Range请求并行下载 total_size 字节的文件，返回False时应回退到单连接下载"""
+        import requests
+        
+        segment_size = -(-total_size // n)
+        segments = [
+            (start, min(start + segment_size, total_size) - 1)
+            for start in range(0, total_size, segment_size)
+        ]
+        lock = threading.Lock()
+        
+        self._print('info', f"正在分段下载 {filename}... ({len(segments)} 个连接)")
+        if _debug_enabled():
+            logger.debug("开始分段下载文件", url=url, filename=filename, size=total_size, segments=len(segments))
+        
+        # 支持 pwrite 的平台上所有线程共用一个文件描述符按偏移写入，不争用文件位置
+        use_pwrite = hasattr(os, 'pwrite')
+        fd = None
+        
+        try:
+            # 预先分配文件大小，各线程写入互不重叠的区域
+            with open(filename, 'wb') as file:
+                self._preallocate(file, total_size)
+            if use_pwrite:
+                fd = os.open(filename, os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+            
+            with self._progress_bar(filename, total_size) as progress_bar:
+                
+                def fetch_segment(start: int, end: int) -> int:
+                    """下载 [start, end] 分段，失败时从已写入的位置继续重试，返回写入的字节数"""
+                    position = start
+                    pending = 0
+                    file = None if use_pwrite else open(filename, 'r+b', buffering=self.CHUNK_SIZE)
+                    try:
+                        for attempt in range(self.SEGMENT_MAX_RETRIES):
+                            headers = {'Range': f'bytes={position}-{end}'}
+                            try:
+                                with self._session.get(url, headers=headers, stream=True, timeout=30) as response:
+                                    # 返回200说明服务器忽略了Range，无法分段
+                                    if response.status_code != 206:
+                                        raise requests.RequestException(f"服务器不支持分段下载 (HTTP {response.status_code})")
+                                    if file is not None:
+                                        file.seek(position)
+                                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                                        if chunk:
+                                            if file is None:
+                                                os.pwrite(fd, chunk, position)
+                                            else:
+                                                file.write(chunk)
+                                            position += len(chunk)
+                                            pending += len(chunk)
+                                            if pending >= self.PROGRESS_UPDATE_BYTES:
+                                                with lock:
+                                                    progress_bar.update(pending)
+                                                pending = 0
+                                break
+                            except (requests.ConnectionError, requests.Timeout,
+                                    requests.exceptions.ChunkedEncodingError) as e:
+                                # 只重试网络中断类错误，服务器不支持分段时直接回退
+                                if attempt == self.SEGMENT_MAX_RETRIES - 1:
+                                    raise
+                                if _debug_enabled():
+                                    logger.debug("分段下载失败，准备重试", start=position, end=end, attempt=attempt+1, error=str(e))
+                                time.sleep(self._retry_delay(attempt))
+                    finally:
+                        if file is not None:
+                            file.close()
+                        with lock:
+                            progress_bar.update(pending)
+                    return position - start
+                
+                with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                    futures = [executor.submit(fetch_segment, start, end) for start, end in segments]
+                    written_total = sum(future.result() for future in futures)
+            
+            if written_total != total_size:
+                self._print('warning', f"分段下载不完整: 预期 {total_size} 字节, 实际 {written_total} 字节")
+                self._discard_partial(filename)
+                return False
+            return True
+            
+        except (requests.RequestException, OSError) as e:
+            self._print('warning', f"分段下载失败，改用单连接下载: {str(e)}")
+            logger.warning("分段下载失败", error=str(e), url=url)
+            self._discard_partial(filename)
+            return False
+        finally:
+            if fd is not None:
+                os.close(fd)
+    
+    @staticmethod
+    def _discard_partial(filename: str):
+        """删除无法继续使用的下载文件（如不连续的分段、校验失败的文件）"""
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+    
+    def _write_response(self, response: "requests.Response", filename: str, total_size: int, offset: int = 0,
+                        hasher: Optional["hashlib._Hash"] = None):
+        """将响应内容写入文件，offset 不为0时追加到已有内容之后；hasher 不为空时同步更新摘要"""
+        # 没有终端显示进度条时（如重定向输出、CI），直接按块复制
+        if sys.stdout.isatty():
+            self._download_with_progress(response, filename, total_size, offset, hasher)
+        else:
+            self._download_raw(response, filename, total_size, offset, hasher)
+    
+    def _download_with_progress(self, response: "requests.Response", filename: str, total_size: int, offset: int = 0,
+                                hasher: Optional["hashlib._Hash"] = None):
+        """逐块写入文件并更新进度条"""
+        with self._open_for_download(filename, total_size, offset) as file, \
+                self._progress_bar(filename, total_size, offset) as progress_bar:
+            pending = 0
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                if chunk:
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    file.write(chunk)
+                    pending += len(chunk)
+                    if pending >= self.PROGRESS_UPDATE_BYTES:
+                        progress_bar.update(pending)
+                        pending = 0
+            progress_bar.update(pending)
+    
+    def _download_raw(self, response: "requests.Response", filename: str, total_size: int, offset: int = 0,
+                      hasher: Optional["hashlib._Hash"] = None):
+        """不显示进度，由 shutil.copyfileobj 在C层完成读写循环"""
+        import requests
+        from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+        
+        response.raw.decode_content = True
+        # 直接读取 raw 时异常不会被 requests 包装，这里按 iter_content 的方式转换
+        try:
+            with self._open_for_download(filename, total_size, offset) as file:
+                if hasher is None:
+                    shutil.copyfileobj(response.raw, file, self.CHUNK_SIZE)
+                else:
+                    # 需要计算摘要时按块读取，hashlib 处理大块数据时会释放GIL
+                    while True:
+                        chunk = response.raw.read(self.CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        hasher.update(chunk)
+                        file.write(chunk)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+    
+    @contextmanager
+    def _open_for_download(self, filename: str, total_size: int, offset: int = 0):
+        """打开下载目标文件并预分配空间，offset 不为0时从该位置继续写入"""
+        mode = 'r+b' if offset else 'wb'
+        with open(filename, mode, buffering=self.CHUNK_SIZE) as file:
+            self._preallocate(file, total_size)
+            file.seek(offset)
+            try:
+                yield file
+            finally:
+                # 截掉预分配但未写入的部分，使文件大小等于实际下载量，便于校验和断点续传
+                file.truncate(file.tell())
+    
+    def _preallocate(self, file, size: int):
+        """按已知大小一次性预分配文件空间，减少文件系统碎片和元数据更新"""
+        if size <= 0:
+            return
+        try:
+            if hasattr(os, 'posix_fallocate'):
+                # Linux 等：分配磁盘块并把文件扩展到 size
+                os.posix_fallocate(file.fileno(), 0, size)
+                return
+            if sys.platform == 'darwin':
+                self._preallocate_macos(file.fileno(), size)
+        except OSError:
+            # 部分文件系统不支持预分配
+            pass
+        # Windows 上 truncate 通过 SetEndOfFile 一次扩展到目标大小；macOS 预留磁盘块后同样需要设置文件大小
+        file.truncate(size)
+    
+    @staticmethod
+    def _preallocate_macos(fd: int, size: int):
+        """macOS 上用 F_PREALLOCATE 预留磁盘块，优先申请连续空间"""
+        import fcntl
+        
+        F_ALLOCATECONTIG = 0x2
+        F_ALLOCATEALL = 0x4
+        F_PEOFPOSMODE = 3
+        F_PREALLOCATE = getattr(fcntl, 'F_PREALLOCATE', 42)
+        
+        # struct fstore: fst_flags, fst_posmode, fst_offset, fst_length, fst_bytesalloc
+        for flags in (F_ALLOCATECONTIG | F_ALLOCATEALL, F_ALLOCATEALL):
+            fstore = struct.pack('IiqqQ', flags, F_PEOFPOSMODE, 0, size, 0)
+            try:
+                fcntl.fcntl(fd, F_PREALLOCATE, fstore)
+                return
+            except OSError:
+                continue
+    
+    @contextmanager
+    def _open_zip_source(self, archive_path: str):
+        """以只读内存映射打开压缩包，多个线程各自映射时共享同一份页缓存
+        
+        空文件或无法映射时退回到大缓冲的普通文件读取
+        """
+        with open(archive_path, 'rb', buffering=self.CHUNK_SIZE) as fh:
+            try:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                yield fh
+                return
+            with mm:
+                yield _MmapFile(mm)
+    
+    def _progress_bar(self, desc: str, total: int, initial: int = 0) -> "tqdm":
+        """创建下载进度条"""
+        from tqdm import tqdm
+        
+        return tqdm(
+            desc=desc,
+            total=total,
+            initial=initial,
+            position=self.progress_position,
+            unit='iB',
+            unit_scale=True,
+            unit_divisor=1024,
+            mininterval=self.PROGRESS_MIN_INTERVAL,
+            miniters=0,
+        )
+    
+    def extract_archive(self, archive_path: str, extract_to: str, member_names: Optional[list] = None) -> bool:
+        """解压文件
+        
+        Args:
+            member_names: 传入列表时写入压缩包内的成员名，调用方据此查找文件而无需再遍历解压目录
+        """
+        import zipfile
+        
         try:
             ui.print_info("正在解压文件...")
-            logger.info("开始解压文件", archive=archive_path, target=extract_to)
+            if _debug_enabled():
+                logger.debug("开始解压文件", archive=archive_path, target=extract_to)
             
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_to)
+            # 内存映射读取压缩包，逐个成员用1MB缓冲复制，减少系统调用次数
+            with self._open_zip_source(archive_path) as fh, zipfile.ZipFile(fh) as zip_ref:
+                members = zip_ref.infolist()
+                if member_names is not None:
+                    member_names[:] = [info.filename for info in members]
+                if any(info.compress_type == self.ZIP_DEFLATE64 for info in members) and not self._enable_deflate64():
+                    return False
+                workers = min(os.cpu_count() or 1, self.PARALLEL_EXTRACT_MAX_WORKERS)
+                if len(members) < self.PARALLEL_EXTRACT_MIN_MEMBERS or workers < 2:
+                    for info in members:
+                        self._extract_zip_member(zip_ref, info, extract_to)
+                else:
+                    self._extract_zip_parallel(archive_path, members, extract_to, workers)
             
             ui.print_success("解压完成")
             logger.info("文件解压完成")
@@ -122,6 +700,458 @@ class BaseDownloader:
             logger.error("文件解压失败", error=str(e))
             return False
     
+    def stream_extract(self, url: str, extract_to: str) -> bool:
+        """边下载边解压tar.gz文件，数据不落地为临时压缩包
+        
+        下载中断时改用 download_file（带重试和断点续传）下载完整文件后再解压
+        """
+        import requests
+        import tarfile
+        import urllib3
+        from tqdm import tqdm
+        
+        try:
+            ui.print_info(f"正在下载并解压 {os.path.basename(url)}...")
+            if _debug_enabled():
+                logger.debug("开始流式下载解压", url=url, target=extract_to)
+            
+            with self._session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                total_size = int(response.headers.get('content-length', 0))
+                response.raw.decode_content = True
+                
+                with tqdm.wrapattr(
+                    response.raw,
+                    "read",
+                    desc=os.path.basename(url),
+                    total=total_size,
+                    unit='iB',
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    mininterval=self.PROGRESS_MIN_INTERVAL,
+                    miniters=0,
+                ) as raw:
+                    pigz = shutil.which("pigz")
+                    if pigz:
+                        self._extract_tar_with_pigz(pigz, raw, extract_to)
+                    else:
+                        with tarfile.open(fileobj=raw, mode='r|gz', bufsize=self.CHUNK_SIZE) as tar:
+                            self._extract_tar(tar, extract_to)
+            
+            ui.print_success("解压完成")
+            logger.info("流式下载解压完成", target=extract_to)
+            return True
+            
+        except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+            # 直接读取 response.raw 时传输中断抛出的是 urllib3 的异常
+            # 客户端错误说明链接无效，重试没有意义
+            response = e.response if isinstance(e, requests.HTTPError) else None
+            if response is not None and 400 <= response.status_code < 500:
+                ui.print_error(f"URL无效或文件不存在: {url}")
+                logger.error("下载链接无效", url=url, status=response.status_code)
+                return False
+            ui.print_warning(f"边下载边解压失败，改为下载完成后解压: {str(e)}")
+            logger.warning("流式下载解压失败", error=str(e), url=url)
+            return self._download_and_extract_tar(url, extract_to)
+        except (tarfile.TarError, OSError) as e:
+            ui.print_error(f"下载解压失败：{str(e)}")
+            logger.error("流式下载解压失败", error=str(e), url=url)
+            return False
+    
+    def _download_and_extract_tar(self, url: str, extract_to: str) -> bool:
+        """下载完整的tar.gz到解压目录旁，再从本地文件解压"""
+        import tarfile
+        
+        filename = os.path.join(os.path.dirname(os.path.abspath(extract_to)), os.path.basename(url))
+        if not self.download_file(url, filename):
+            return False
+        
+        try:
+            # 清掉中断前解压出的部分文件，从头解压一遍
+            shutil.rmtree(extract_to, ignore_errors=True)
+            with tarfile.open(filename, mode='r:gz', bufsize=self.CHUNK_SIZE) as tar:
+                self._extract_tar(tar, extract_to)
+            ui.print_success("解压完成")
+            logger.info("文件解压完成", archive=filename, target=extract_to)
+            return True
+        except (tarfile.TarError, OSError) as e:
+            ui.print_error(f"解压失败：{str(e)}")
+            logger.error("文件解压失败", error=str(e), archive=filename)
+            return False
+        finally:
+            self._discard_partial(filename)
+    
+    def _extract_tar(self, tar: "tarfile.TarFile", extract_to: str):
+        """解压tar包，成员路径或链接目标跳出解压目录时抛出 TarError"""
+        import tarfile
+        
+        # 3.12 及部分补丁版本自带 data 过滤器，同时会清除 setuid 等危险权限位
+        if hasattr(tarfile, 'data_filter'):
+            tar.extractall(extract_to, filter='data')
+        else:
+            tar.extractall(extract_to, members=self._checked_tar_members(tar, extract_to))
+    
+    @staticmethod
+    def _checked_tar_members(tar: "tarfile.TarFile", extract_to: str):
+        """逐个检查tar成员后交给 extractall，流式读取时也能在写入前拦截"""
+        import tarfile
+        
+        root = os.path.abspath(extract_to)
+        for member in tar:
+            target = os.path.abspath(os.path.join(root, member.name))
+            if os.path.commonpath([root, target]) != root:
+                raise tarfile.TarError(f"非法的压缩包成员路径: {member.name}")
+            if member.issym() or member.islnk():
+                # 符号链接相对其所在目录解析，硬链接相对压缩包根目录解析
+                base = os.path.dirname(target) if member.issym() else root
+                link_target = os.path.abspath(os.path.join(base, member.linkname))
+                if os.path.commonpath([root, link_target]) != root:
+                    raise tarfile.TarError(f"非法的压缩包链接目标: {member.name} -> {member.linkname}")
+            elif member.isdev():
+                raise tarfile.TarError(f"压缩包中不允许设备文件: {member.name}")
+            yield member
+    
+    def _extract_tar_with_pigz(self, pigz: str, raw, extract_to: str):
+        """用 pigz 子进程解压gzip，Python只负责读取tar流，解压与写文件在两个进程中并行"""
+        import tarfile
+        
+        process = subprocess.Popen([pigz, "-dc"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL)
+        feed_error = []
+        
+        def feed():
+            # 把下载的数据转交给 pigz，读完后关闭其输入使其结束
+            try:
+                while True:
+                    chunk = raw.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    process.stdin.write(chunk)
+            except BrokenPipeError:
+                pass
+            except Exception as e:
+                feed_error.append(e)
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+        
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            with tarfile.open(fileobj=process.stdout, mode='r|', bufsize=self.CHUNK_SIZE) as tar:
+                self._extract_tar(tar, extract_to)
+            # 读完剩余输出（tar结尾的填充块），避免 pigz 阻塞在写管道
+            while process.stdout.read(self.CHUNK_SIZE):
+                pass
+        except BaseException as e:
+            process.kill()
+            feeder.join()
+            # 下载中断时 tar 只会读到截断的数据，抛出下载错误以便调用方改为重新下载
+            if feed_error and isinstance(e, (tarfile.TarError, EOFError, OSError)):
+                raise feed_error[0] from e
+            raise
+        finally:
+            feeder.join()
+            process.stdout.close()
+            process.wait()
+        
+        if feed_error:
+            raise feed_error[0]
+        if process.returncode != 0:
+            raise tarfile.ReadError(f"pigz 解压失败，返回码: {process.returncode}")
+    
+    def stream_extract_zip(self, url: str, filename: str, extract_to: str, sha256: Optional[str] = None,
+                           member_names: Optional[list] = None) -> bool:
+        """边下载边按本地文件头顺序解压zip，压缩包同时保存为 filename
+        
+        遇到无法流式处理的成员（加密、非Deflate压缩等）时下载完整文件后再解压；
+        下载中断时改用 download_file 从已下载的部分续传后再解压。
+        提供 sha256 时先解压到解压目录旁的暂存目录，摘要校验通过后才移入 extract_to。
+        member_names 的含义同 extract_archive
+        """
+        import requests
+        
+        part_file = filename + '.part'
+        expected_sha256 = sha256.lower() if sha256 else None
+        hasher = hashlib.sha256() if expected_sha256 else None
+        stage_dir = self._staging_dir(extract_to) if expected_sha256 else None
+        if stage_dir:
+            shutil.rmtree(stage_dir, ignore_errors=True)
+        
+        try:
+            ui.print_info(f"正在下载并解压 {os.path.basename(filename)}...")
+            if _debug_enabled():
+                logger.debug("开始边下载边解压zip", url=url, target=extract_to)
+            
+            with self._session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                total_size = int(response.headers.get('content-length', 0))
+                response.raw.decode_content = True
+                
+                with open(part_file, 'wb', buffering=self.CHUNK_SIZE) as file, \
+                        self._progress_bar(os.path.basename(filename), total_size) as progress_bar:
+                    reader = _ZipStreamReader(response.raw, file, hasher, progress_bar, self.CHUNK_SIZE)
+                    streamed = self._extract_zip_stream(reader, stage_dir or extract_to, member_names)
+                    reader.drain()
+            
+            if total_size and os.path.getsize(part_file) < total_size:
+                raise EOFError("下载的数据少于 Content-Length")
+            
+        except requests.HTTPError as e:
+            if stage_dir:
+                shutil.rmtree(stage_dir, ignore_errors=True)
+            # 客户端错误说明链接无效，不必再尝试普通下载
+            if e.response is not None and 400 <= e.response.status_code < 500:
+                ui.print_error(f"URL无效或文件不存在: {url}")
+                logger.error("下载链接无效", url=url, status=e.response.status_code)
+                return False
+            ui.print_warning(f"边下载边解压失败，改为下载完成后解压: {str(e)}")
+            logger.warning("流式解压zip失败", error=str(e), url=url)
+            return self.download_file(url, filename, sha256=sha256) and self.extract_archive(filename, extract_to, member_names)
+        except Exception as e:
+            # 已下载的部分保留在 .part 文件中，由 download_file 续传
+            if stage_dir:
+                shutil.rmtree(stage_dir, ignore_errors=True)
+            ui.print_warning(f"边下载边解压失败，改为下载完成后解压: {str(e)}")
+            logger.warning("流式解压zip失败", error=str(e), url=url)
+            return self.download_file(url, filename, sha256=sha256) and self.extract_archive(filename, extract_to, member_names)
+        
+        if hasher is not None and not self._verify_sha256(hasher.hexdigest(), expected_sha256, part_file):
+            # 校验失败的内容只存在于暂存目录中，不会留在 extract_to
+            shutil.rmtree(stage_dir, ignore_errors=True)
+            return False
+        os.replace(part_file, filename)
+        self._completed_downloads[filename] = url
+        
+        if not streamed:
+            if stage_dir:
+                shutil.rmtree(stage_dir, ignore_errors=True)
+            ui.print_info("压缩包不支持边下载边解压，正在解压完整文件...")
+            return self.extract_archive(filename, extract_to, member_names)
+        
+        if stage_dir:
+            try:
+                self._move_staged_tree(stage_dir, extract_to)
+            except OSError as e:
+                ui.print_error(f"解压失败：{str(e)}")
+                logger.error("移动暂存解压文件失败", error=str(e), target=extract_to)
+                return False
+            finally:
+                shutil.rmtree(stage_dir, ignore_errors=True)
+        
+        ui.print_success("解压完成")
+        logger.info("边下载边解压zip完成", target=extract_to)
+        return True
+    
+    @staticmethod
+    def _staging_dir(extract_to: str) -> str:
+        """解压目录旁的暂存目录，与目标位于同一文件系统，移入时只需重命名"""
+        target = os.path.abspath(extract_to)
+        return os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.staging")
+    
+    @staticmethod
+    def _move_staged_tree(stage_dir: str, extract_to: str):
+        """把暂存目录中的文件逐个移入 extract_to，与目标目录中已有的内容合并"""
+        for root, _dirs, files in os.walk(stage_dir):
+            dest_root = os.path.normpath(os.path.join(extract_to, os.path.relpath(root, stage_dir)))
+            os.makedirs(dest_root, exist_ok=True)
+            for name in files:
+                os.replace(os.path.join(root, name), os.path.join(dest_root, name))
+    
+    def _extract_zip_stream(self, reader: _ZipStreamReader, extract_to: str,
+                            member_names: Optional[list] = None) -> bool:
+        """按本地文件头依次解压成员，返回False表示遇到需要读取中央目录才能处理的内容"""
+        import zipfile
+        
+        if member_names is not None:
+            member_names.clear()
+        
+        while True:
+            signature = reader.read_exact(4)
+            if signature != b'PK\x03\x04':
+                # 读到中央目录（空压缩包时为目录结束记录）说明所有成员都已解压
+                return signature in (b'PK\x01\x02', b'PK\x05\x06')
+            
+            (_version, flags, method, _mtime, _mdate, crc, compressed_size, _file_size,
+             name_length, extra_length) = struct.unpack('<HHHHHIIIHH', reader.read_exact(26))
+            name = reader.read_exact(name_length).decode('utf-8' if flags & 0x800 else 'cp437')
+            extra = reader.read_exact(extra_length)
+            
+            has_descriptor = bool(flags & 0x08)
+            # 加密成员、非Stored/Deflate压缩、大小未知的Stored成员无法流式处理
+            if flags & 0x01 or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                return False
+            if has_descriptor and method == zipfile.ZIP_STORED:
+                return False
+            
+            zip64_sizes = self._zip64_local_sizes(extra)
+            if compressed_size == 0xFFFFFFFF and not has_descriptor:
+                if zip64_sizes is None:
+                    return False
+                compressed_size = zip64_sizes[1]
+            
+            info = zipfile.ZipInfo(name)
+            target = self._zip_member_target(info, extract_to)
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+                output = None
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                output = open(target, 'wb')
+            
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == zipfile.ZIP_DEFLATED else None
+            crc_value = 0
+            try:
+                if has_descriptor:
+                    # 大小写在成员数据之后，只能靠Deflate流自身的结束标记判断成员结尾
+                    while not decompressor.eof:
+                        data = reader.read_some(self.CHUNK_SIZE)
+                        if not data:
+                            raise EOFError("压缩包数据不完整")
+                        chunk = decompressor.decompress(data)
+                        crc_value = zlib.crc32(chunk, crc_value)
+                        if output is not None:
+                            output.write(chunk)
+                    reader.unread(decompressor.unused_data)
+                    
+                    # 数据描述符：可选签名 + CRC32 + 压缩前后大小（ZIP64时各8字节）
+                    descriptor = reader.read_exact(4)
+                    if descriptor == b'PK\x07\x08':
+                        descriptor = reader.read_exact(4)
+                    crc = struct.unpack('<I', descriptor)[0]
+                    reader.read_exact(16 if zip64_sizes is not None else 8)
+                else:
+                    remaining = compressed_size
+                    while remaining:
+                        data = reader.read_some(min(self.CHUNK_SIZE, remaining))
+                        if not data:
+                            raise EOFError("压缩包数据不完整")
+                        remaining -= len(data)
+                        chunk = decompressor.decompress(data) if decompressor else data
+                        crc_value = zlib.crc32(chunk, crc_value)
+                        if output is not None:
+                            output.write(chunk)
+                    if decompressor is not None:
+                        chunk = decompressor.flush()
+                        crc_value = zlib.crc32(chunk, crc_value)
+                        if output is not None:
+                            output.write(chunk)
+            finally:
+                if output is not None:
+                    output.close()
+            
+            if crc_value != crc:
+                raise zipfile.BadZipFile(f"压缩包成员CRC校验失败: {name}")
+            if member_names is not None:
+                member_names.append(name)
+    
+    @staticmethod
+    def _zip64_local_sizes(extra: bytes) -> Optional[Tuple[int, int]]:
+        """从本地文件头的扩展字段中取出ZIP64的 (原始大小, 压缩后大小)，没有时返回None"""
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, size = struct.unpack_from('<HH', extra, offset)
+            if header_id == 0x0001 and size >= 16:
+                return struct.unpack_from('<QQ', extra, offset + 4)
+            offset += 4 + size
+        return None
+    
+    def _enable_deflate64(self) -> bool:
+        """为标准库 zipfile 注册Deflate64解压器，只在压缩包确实用到时才导入扩展"""
+        try:
+            # zipfile-deflate64 导入时即为 zipfile 注册 Deflate64 解压器
+            import zipfile_deflate64  # noqa: F401
+            return True
+        except ImportError:
+            ui.print_error("该压缩包使用了Deflate64压缩，请先安装扩展: pip install zipfile-deflate64")
+            logger.error("缺少Deflate64解压支持", package="zipfile-deflate64")
+            return False
+    
+    def _extract_zip_parallel(self, archive_path: str, members: list, extract_to: str, workers: int):
+        """按成员大小均衡分组，每个线程用独立的映射解压一组成员"""
+        import zipfile
+        
+        # 先在主线程创建全部目录，避免多个线程同时创建同一目录
+        directories = set()
+        for info in members:
+            target = self._zip_member_target(info, extract_to)
+            directories.add(target if info.is_dir() else os.path.dirname(target))
+        for directory in sorted(directories):
+            os.makedirs(directory, exist_ok=True)
+        
+        # 从大到小依次分给当前总量最小的一组
+        batches = [[] for _ in range(workers)]
+        loads = [0] * workers
+        for info in sorted(members, key=lambda m: m.file_size, reverse=True):
+            if info.is_dir():
+                continue
+            index = loads.index(min(loads))
+            batches[index].append(info)
+            loads[index] += info.file_size
+        
+        def extract_batch(batch: list):
+            with self._open_zip_source(archive_path) as fh, zipfile.ZipFile(fh) as zip_ref:
+                for info in batch:
+                    self._extract_zip_member(zip_ref, info, extract_to)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(extract_batch, batch) for batch in batches if batch]
+            for future in futures:
+                future.result()
+    
+    @staticmethod
+    def _zip_member_target(info: "zipfile.ZipInfo", extract_to: str) -> str:
+        """计算zip成员的解压路径，成员路径跳出解压目录时抛出 BadZipFile"""
+        import zipfile
+        
+        root = os.path.abspath(extract_to)
+        target = os.path.abspath(os.path.join(root, info.filename))
+        if os.path.commonpath([root, target]) != root:
+            raise zipfile.BadZipFile(f"非法的压缩包成员路径: {info.filename}")
+        return target
+    
+    def _extract_zip_member(self, zip_ref: "zipfile.ZipFile", info: "zipfile.ZipInfo", extract_to: str) -> str:
+        """解压单个zip成员，返回解压后的路径"""
+        # 防止成员路径跳出解压目录
+        target = self._zip_member_target(info, extract_to)
+        
+        if info.is_dir():
+            os.makedirs(target, exist_ok=True)
+            return target
+        
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with zip_ref.open(info) as source, open(target, 'wb') as dest:
+            shutil.copyfileobj(source, dest, self.CHUNK_SIZE)
+        return target
+    
+    def copy_file(self, src: str, dst: str) -> str:
+        """复制文件并保留元数据（同 shutil.copy2），返回目标路径
+        
+        Linux 上优先用 copy_file_range 在内核中复制，btrfs/xfs 等支持 reflink 的文件系统无需复制数据
+        """
+        if os.path.isdir(dst):
+            dst = os.path.join(dst, os.path.basename(src))
+        
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                if remaining <= 0:
+                    shutil.copystat(src, dst)
+                    return dst
+            except OSError:
+                # 跨文件系统或内核不支持时交给 shutil（其内部会尝试 sendfile 等方式）
+                pass
+        
+        return shutil.copy2(src, dst)
+    
     def run_installer(self, installer_path: str, install_args: Optional[list] = None) -> bool:
         """运行安装程序"""
         try:
@@ -173,10 +1203,18 @@ class BaseDownloader:
         """获取下载文件名 - 子类可以重写"""
         return f"{self.name.lower()}_installer"
     
+    def get_prefetch_target(self, temp_dir: Path) -> Optional[Tuple[str, Path]]:
+        """获取可提前下载的(下载链接, 保存路径) - 需要用户交互选择版本的下载器返回None"""
+        return None
+    
     def download_and_install(self, temp_dir: Path) -> bool:
         """下载并安装组件 - 子类必须实现"""
         raise NotImplementedError("子类必须实现 download_and_install 方法")
     
     def check_installation(self) -> Tuple[bool, str]:
         """检查组件是否已安装 - 子类可以重写"""
-        return False, "检查安装状态的方法未实现"
\ No newline at end of file
+        return False, "检查安装状态的方法未实现"
+    
+    def clear_installation_cache(self):
+        """清除安装状态缓存 - 缓存了 check_installation 结果的子类需要重写"""
+        pass
\ No newline at end of file
@@ -5,13 +5,19 @@
 """
 
 import os
+import queue
 import tempfile
 import shutil
+import stat
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import structlog
 
 from ...ui.interface import ui
+from .base_downloader import BaseDownloader
 from .nodejs_downloader import NodeJSDownloader
 from .vscode_downloader import VSCODEDownloader
 from .git_downloader import GitDownloader
@@ -27,6 +33,9 @@ logger = structlog.get_logger(__name__)
 class ComponentManager:
     """组件下载管理器"""
     
+    # 批量下载时同时进行的下载数，避免给下载服务器造成过大压力
+    MAX_PARALLEL_DOWNLOADS = 3
+    
     def __init__(self):
         # 组件下载器映射
         self.downloaders = {
@@ -119,12 +128,14 @@ class ComponentManager:
             )
         
         ui.console.print(table)
-        ui.console.print("\n[Q] 返回上级菜单", style=ui.colors["info"])
+        ui.console.print("\n可输入多个序号（用逗号或空格分隔）批量下载", style=ui.colors["info"])
+        ui.console.print("[Q] 返回上级菜单", style=ui.colors["info"])
         
         return self._get_component_choice()
     
-    def _get_component_choice(self) -> Optional[str]:
-        """获取用户选择的组件"""
+    def _get_component_choice(self) -> Optional[List[str]]:
+        """获取用户选择的组件，可一次选择多个"""
+        keys = list(self.components_info.keys())
         while True:
             choice = ui.get_input("请选择要下载的组件：").strip().upper()
             
@@ -132,14 +143,15 @@ class ComponentManager:
                 return None
             
             try:
-                choice_num = int(choice)
-                if 1 <= choice_num <= len(self.components_info):
-                    component_key = list(self.components_info.keys())[choice_num - 1]
-                    return component_key
-                else:
-                    ui.print_error("无效选项，请重新选择")
+                choice_nums = [int(part) for part in choice.replace(',', ' ').replace('，', ' ').split()]
             except ValueError:
                 ui.print_error("请输入有效的数字")
+                continue
+            
+            if choice_nums and all(1 <= num <= len(keys) for num in choice_nums):
+                # 去掉重复的序号，保持输入顺序
+                return list(dict.fromkeys(keys[num - 1] for num in choice_nums))
+            ui.print_error("无效选项，请重新选择")
     
     def download_component(self, component_key: str) -> bool:
         """下载指定组件"""
@@ -159,6 +171,8 @@ class ComponentManager:
             success = downloader.download_and_install(temp_dir)
             
             if success:
+                # 安装完成后重新检测，让界面显示新安装的版本
+                downloader.clear_installation_cache()
                 ui.print_success(f"✅ {info['name']} 下载并安装完成")
                 logger.info("组件下载成功", component=component_key)
                 
@@ -183,14 +197,15 @@ class ComponentManager:
         """清理安装包"""
         try:
             # 根据组件类型清理相关文件
+            # glob 在 Linux/macOS 上区分大小写，文件名大小写需与各下载器的 get_filename 一致
             patterns = {
-                'nodejs': ['nodejs*.exe', 'nodejs*.msi'],
+                'nodejs': ['nodejs*.exe', 'nodejs*.msi', 'nodejs*.pkg', 'nodejs*.tar.gz'],
                 'vscode': ['VSCode*.exe', 'VSCode*.zip'],
-                'git': ['Git*.exe', 'Git*.msi'],
-                'go': ['go*.msi', 'go*.tar.gz'],  # 修正Go的清理模式
-                'python': ['python*.exe', 'python*.msi'],
-                'mongodb': ['mongodb*.exe', 'mongodb*.msi'],
-                'sqlitestudio': ['SQLiteStudio*.exe', 'SQLiteStudio*.zip'],
+                'git': ['Git*.exe', 'Git*.msi', 'MinGit*.zip', 'git*.dmg', 'git*.tar.gz'],
+                'go': ['go*.msi', 'go*.pkg', 'go*.tar.gz'],  # 修正Go的清理模式
+                'python': ['python*.exe', 'python*.msi', 'python*.pkg', 'python*.tar.xz'],
+                'mongodb': ['mongodb*.exe', 'mongodb*.msi', 'mongodb*.dmg', 'mongodb*.tgz'],
+                'sqlitestudio': ['SQLiteStudio*.exe', 'SQLiteStudio*.zip', 'SQLiteStudio*.tar.gz'],
                 'napcat': ['NapCat*.zip']
             }
             
@@ -207,11 +222,6 @@ class ComponentManager:
     
     def _safe_delete_file(self, file_path: Path, max_retries: int = 5, retry_delay: float = 1.0):
         """安全删除文件，支持重试和强制删除"""
-        import time
-        import os
-        import stat
-        import subprocess
-        
         for attempt in range(max_retries):
             try:
                 # 检查文件是否存在
@@ -288,12 +298,58 @@ class ComponentManager:
         """批量下载组件"""
         results = {}
         
+        # 先并行下载无需交互的安装包，后续安装时直接使用
+        self._prefetch_downloads(component_keys, self.get_temporary_directory())
+        
         for key in component_keys:
             ui.print_info(f"正在下载组件 {key} ({len(results) + 1}/{len(component_keys)})")
             results[key] = self.download_component(key)
         
         return results
     
+    def _prefetch_downloads(self, component_keys: List[str], temp_dir: Path):
+        """并行预下载多个组件的安装包，失败的组件会在安装时重新下载"""
+        targets = []
+        for key in component_keys:
+            downloader = self.downloaders.get(key)
+            target = downloader.get_prefetch_target(temp_dir) if downloader else None
+            if target:
+                targets.append((key, downloader, target))
+        
+        if len(targets) < 2:
+            return
+        
+        ui.print_info(f"正在并行下载 {len(targets)} 个组件的安装包...")
+        # 同时进行的下载各占终端的一行显示进度，分段连接数按并发数分摊，
+        # 总连接数不超过单个文件分段下载时的连接数
+        workers = min(self.MAX_PARALLEL_DOWNLOADS, len(targets))
+        connections = max(1, BaseDownloader.PARALLEL_CONNECTIONS // workers)
+        free_positions = queue.Queue()
+        for position in range(workers):
+            free_positions.put(position)
+        
+        def prefetch(downloader, url: str, file_path: Path) -> bool:
+            position = free_positions.get()
+            downloader.progress_position = position
+            downloader.parallel_connections = connections
+            try:
+                return downloader.download_file(url, str(file_path))
+            finally:
+                downloader.progress_position = None
+                downloader.parallel_connections = BaseDownloader.PARALLEL_CONNECTIONS
+                free_positions.put(position)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                key: executor.submit(prefetch, downloader, url, file_path)
+                for key, downloader, (url, file_path) in targets
+            }
+            for key, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning("组件预下载失败", component=key, error=str(e))
+    
     def get_component_info(self, component_key: str) -> Optional[Dict]:
         """获取组件信息"""
         return self.components_info.get(component_key)
@@ -3,44 +3,82 @@
 Git下载器
 """
 
-import platform
 import os
+import shutil
 import subprocess
 import ctypes
-import requests
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import structlog
 
 from ...ui.interface import ui
-from .base_downloader import BaseDownloader
+from .base_downloader import ARCH, SYSTEM, BaseDownloader
 
 logger = structlog.get_logger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _probe_git_version() -> Tuple[bool, str]:
+    """探测Git安装状态，结果在进程内缓存，安装完成后需调用 cache_clear()"""
+    try:
+        # 不在PATH中时无需启动子进程
+        if shutil.which("git") is None:
+            return False, "Git 未安装"
+        
+        result = subprocess.run(
+            ["git", "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=10
+        )
+        
+        if result.returncode == 0:
+            version = result.stdout.strip()
+            return True, f"Git 已安装，版本: {version}"
+        else:
+            return False, "Git 未安装"
+            
+    except Exception as e:
+        return False, f"检查Git安装状态时发生错误: {str(e)}"
+
+
 class GitDownloader(BaseDownloader):
     """Git下载器"""
     
+    # 各平台默认下载链接与文件名，未列出的平台按Linux处理
+    _DOWNLOAD_URLS = {
+        # Git for Windows 发布的 MinGit 便携包，直接解压即可使用，无需运行安装程序
+        'windows': "https://github.com/git-for-windows/git/releases/download/v2.43.0.windows.1/MinGit-2.43.0-64-bit.zip",
+        'darwin': "https://sourceforge.net/projects/git-osx-installer/files/git-2.43.0-intel-universal-mavericks.dmg/download",
+        'linux': "https://github.com/git/git/archive/refs/tags/v2.43.0.tar.gz",
+    }
+    _FILENAMES = {
+        'windows': "MinGit-2.43.0-64-bit.zip",
+        'darwin': "git-2.43.0.dmg",
+        'linux': "git-2.43.0.tar.gz",
+    }
+    
+    # MinGit 解压到用户目录，不需要管理员权限
+    MINGIT_INSTALL_DIR = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local")) / "Programs" / "MinGit"
+    
     def __init__(self):
         super().__init__("Git")
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
-        
-        # 标准化架构名称
-        if self.arch in ['x86_64', 'amd64']:
-            self.arch = '64'
-        elif self.arch in ['arm64', 'aarch64']:
-            self.arch = 'arm64'
-        else:
-            self.arch = '64'
+        self.system = SYSTEM
+        self.arch = 'arm64' if ARCH == 'arm64' else '64'
     
     def get_git_versions(self) -> List[Dict]:
         """获取Git版本列表"""
+        import requests
+        
         try:
             ui.print_info("正在获取Git最新版本信息...")
             
             # GitHub API获取releases
-            response = requests.get(
+            # 走共享会话，与之后的安装包下载复用连接池
+            response = self._session.get(
                 "https://api.github.com/repos/git-for-windows/git/releases",
                 timeout=10
             )
@@ -58,25 +96,30 @@ class GitDownloader(BaseDownloader):
                 
                 ui.print_info(f"处理版本 {i+1}: {tag_name}")
                 
-                # 查找Windows 64位安装包 - 放宽条件
+                # 查找Windows 64位 MinGit 便携包（排除 busybox 变体）
                 found_asset = None
                 for asset in release['assets']:
                     asset_name = asset['name']
                     ui.print_info(f"  检查资产: {asset_name}")
-                    if ('64-bit.exe' in asset_name and
+                    if (asset_name.startswith('MinGit-') and
+                        asset_name.endswith('64-bit.zip') and
+                        'busybox' not in asset_name.lower() and
                         'preview' not in asset_name.lower() and
                         'test' not in asset_name.lower()):
                         found_asset = asset
-                        ui.print_info(f"  找到Git安装包: {asset_name}")
+                        ui.print_info(f"  找到Git便携包: {asset_name}")
                         break
                 
                 if found_asset:
+                    # GitHub资产的 digest 字段格式为 "sha256:<hex>"，旧版本发布可能没有
+                    digest = found_asset.get('digest') or ''
                     versions.append({
                         "name": tag_name,
                         "display_name": f"{version_name} ({tag_name})",
                         "description": f"发布于 {published_at[:10]}",
                         "download_url": found_asset['browser_download_url'],
                         "asset_name": found_asset['name'],
+                        "sha256": digest[len('sha256:'):] if digest.startswith('sha256:') else None,
                         "version": tag_name,
                         "size": found_asset['size']
                     })
@@ -108,8 +151,8 @@ class GitDownloader(BaseDownloader):
                 "name": "v2.43.0.windows.1",
                 "display_name": "Git 2.43.0 (推荐)",
                 "description": "稳定版本，适合大多数用户",
-                "download_url": "https://github.com/git-for-windows/git/releases/download/v2.43.0.windows.1/Git-2.43.0.0-64-bit.exe",
-                "asset_name": "Git-2.43.0.0-64-bit.exe",
+                "download_url": "https://github.com/git-for-windows/git/releases/download/v2.43.0.windows.1/MinGit-2.43.0-64-bit.zip",
+                "asset_name": "MinGit-2.43.0-64-bit.zip",
                 "version": "v2.43.0.windows.1"
             }
         ]
@@ -186,22 +229,11 @@ class GitDownloader(BaseDownloader):
     
     def get_download_url(self) -> str:
         """获取Git下载链接（兼容性方法）"""
-        if self.system == 'windows':
-            # Git for Windows 官方下载链接格式
-            return "https://github.com/git-for-windows/git/releases/download/v2.43.0.windows.1/Git-2.43.0.0-64-bit.exe"
-        elif self.system == 'darwin':  # macOS
-            return f"https://sourceforge.net/projects/git-osx-installer/files/git-2.43.0-intel-universal-mavericks.dmg/download"
-        else:  # Linux
-            return "https://github.com/git/git/archive/refs/tags/v2.43.0.tar.gz"
+        return self._DOWNLOAD_URLS.get(self.system, self._DOWNLOAD_URLS['linux'])
     
     def get_filename(self) -> str:
         """获取下载文件名（兼容性方法）"""
-        if self.system == 'windows':
-            return "Git-2.43.0.0-64-bit.exe"
-        elif self.system == 'darwin':
-            return "git-2.43.0.dmg"
-        else:
-            return "git-2.43.0.tar.gz"
+        return self._FILENAMES.get(self.system, self._FILENAMES['linux'])
     
     def download_and_install(self, temp_dir: Path) -> bool:
         """下载并安装Git"""
@@ -219,24 +251,27 @@ class GitDownloader(BaseDownloader):
             
             ui.print_info(f"正在下载 {self.name} {selected_version['display_name']}...")
             
-            # 下载文件
-            if not self.download_file(download_url, str(file_path)):
+            # 下载文件（发布信息带有摘要时同步校验）
+            if not self.download_file(download_url, str(file_path), sha256=selected_version.get("sha256")):
                 return False
             
             ui.print_info(f"正在安装 {self.name}...")
             
             # 根据系统执行安装
             if self.system == 'windows':
-                # ✅ Windows系统 - 使用专门的方法
-                success = self._install_git_windows(str(file_path))
+                if file_path.suffix.lower() == '.zip':
+                    # MinGit 便携包 - 直接解压，省去安装程序的二次解压
+                    success = self._install_mingit_windows(file_path)
+                else:
+                    # ✅ Windows系统 - 使用专门的方法
+                    success = self._install_git_windows(str(file_path))
             elif self.system == 'darwin':
                 # macOS - 提示用户手动安装
                 ui.print_info("Git for macOS 需要手动安装")
                 ui.print_info(f"请打开下载的文件: {file_path}")
                 if ui.confirm("是否打开Git安装包？"):
                     try:
-                        import os
-                        os.system(f"open '{file_path}'")
+                        subprocess.Popen(["open", str(file_path)])
                         ui.print_info("已尝试打开安装包，请按照提示完成安装")
                         return True
                     except Exception as e:
@@ -259,23 +294,74 @@ class GitDownloader(BaseDownloader):
     
     def check_installation(self) -> tuple[bool, str]:
         """检查Git是否已安装"""
+        return _probe_git_version()
+    
+    def clear_installation_cache(self):
+        """清除安装状态缓存"""
+        _probe_git_version.cache_clear()
+    
+    def _install_mingit_windows(self, archive_path: Path) -> bool:
+        """在Windows上解压MinGit便携包并加入用户PATH"""
+        target_dir = self.MINGIT_INSTALL_DIR
         try:
-            import subprocess
-            result = subprocess.run(
-                ["git", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            # 覆盖安装时先移除旧版本，避免新旧文件混杂
+            if target_dir.exists():
+                ui.print_info("移除旧版本MinGit...")
+                shutil.rmtree(target_dir)
             
-            if result.returncode == 0:
-                version = result.stdout.strip()
-                return True, f"Git 已安装，版本: {version}"
-            else:
-                return False, "Git 未安装"
+            if not self.extract_archive(str(archive_path), str(target_dir)):
+                return False
+            
+            cmd_dir = str(target_dir / "cmd")
+            if not self._add_to_user_path(cmd_dir):
+                ui.print_warning(f"请手动将 {cmd_dir} 添加到 PATH 环境变量")
+            
+            # 让当前进程也能立即找到 git
+            if cmd_dir not in os.environ.get("PATH", "").split(os.pathsep):
+                os.environ["PATH"] = cmd_dir + os.pathsep + os.environ.get("PATH", "")
+            
+            ui.print_success(f"{self.name} 安装完成，位置: {target_dir}")
+            ui.print_info("新打开的终端即可使用 git 命令")
+            return True
+            
+        except Exception as e:
+            ui.print_error(f"安装MinGit失败：{str(e)}")
+            logger.error("MinGit安装失败", target=str(target_dir), error=str(e))
+            return False
+    
+    def _add_to_user_path(self, directory: str) -> bool:
+        """将目录追加到当前用户的PATH注册表项（HKCU\\Environment）"""
+        try:
+            import winreg
+            
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0,
+                                winreg.KEY_READ | winreg.KEY_WRITE) as key:
+                try:
+                    current_path, value_type = winreg.QueryValueEx(key, "Path")
+                except FileNotFoundError:
+                    current_path, value_type = "", winreg.REG_EXPAND_SZ
                 
+                entries = [entry for entry in current_path.split(";") if entry]
+                if any(os.path.normcase(entry) == os.path.normcase(directory) for entry in entries):
+                    return True
+                
+                entries.append(directory)
+                winreg.SetValueEx(key, "Path", 0, value_type, ";".join(entries))
+            
+            # 通知资源管理器等进程环境变量已变更，新开的终端才能读到新PATH
+            HWND_BROADCAST = 0xFFFF
+            WM_SETTINGCHANGE = 0x001A
+            SMTO_ABORTIFHUNG = 0x0002
+            ctypes.windll.user32.SendMessageTimeoutW(
+                HWND_BROADCAST, WM_SETTINGCHANGE, 0, "Environment", SMTO_ABORTIFHUNG, 5000, None
+            )
+            
+            logger.info("已添加到用户PATH", directory=directory)
+            return True
+            
         except Exception as e:
-            return False, f"检查Git安装状态时发生错误: {str(e)}"
+            logger.error("更新用户PATH失败", directory=directory, error=str(e))
+            return False
     
     def _install_git_windows(self, installer_path: str) -> bool:
         """在Windows上安装Git（使用专门的安装方法）"""
@@ -305,7 +391,6 @@ class GitDownloader(BaseDownloader):
                     
                     # 等待安装完成并清理安装包
                     ui.print_info("等待安装程序完全退出...")
-                    import time
                     time.sleep(3)  # 等待3秒确保安装程序完全退出
                     
                     return True
@@ -334,7 +419,6 @@ class GitDownloader(BaseDownloader):
                     ui.print_info("注意：安装在后台进行，完成后请重新打开终端验证")
                     
                     # 等待一段时间让安装程序启动
-                    import time
                     time.sleep(2)
                     
                     return True
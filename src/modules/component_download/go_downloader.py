@@ -3,56 +3,86 @@
 Go下载器
 """
 
-import platform
 import os
+import shutil
 import subprocess
 import ctypes
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 import structlog
 
 from ...ui.interface import ui
-from .base_downloader import BaseDownloader
+from .base_downloader import ARCH, SYSTEM, BaseDownloader
 
 logger = structlog.get_logger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _probe_go_version() -> Tuple[bool, str]:
+    """探测Go安装状态，结果在进程内缓存，安装完成后需调用 cache_clear()"""
+    try:
+        # 不在PATH中时无需启动子进程
+        if shutil.which("go") is None:
+            return False, "Go 未安装"
+        
+        result = subprocess.run(
+            ["go", "version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=10
+        )
+        
+        if result.returncode == 0:
+            version = result.stdout.strip()
+            return True, f"Go 已安装，版本: {version}"
+        else:
+            return False, "Go 未安装"
+            
+    except Exception as e:
+        return False, f"检查Go安装状态时发生错误: {str(e)}"
+
+
 class GoDownloader(BaseDownloader):
     """Go下载器"""
     
     # ✅ 统一版本号
     GO_VERSION = "1.23.5"
     
+    # 各平台下载链接与文件名模板，未列出的平台按Linux处理
+    _URL_TEMPLATES = {
+        'windows': "https://go.dev/dl/go{version}.windows-{arch}.msi",
+        'darwin': "https://go.dev/dl/go{version}.darwin-{arch}.pkg",
+        'linux': "https://go.dev/dl/go{version}.linux-{arch}.tar.gz",
+    }
+    _FILENAME_TEMPLATES = {
+        'windows': "go{version}.windows-{arch}.msi",
+        'darwin': "go{version}.darwin-{arch}.pkg",
+        'linux': "go{version}.linux-{arch}.tar.gz",
+    }
+    
     def __init__(self):
         super().__init__("Go")
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
-        
-        # 标准化架构名称
-        if self.arch in ['x86_64', 'amd64']:
-            self.arch = 'amd64'
-        elif self.arch in ['arm64', 'aarch64']:
-            self.arch = 'arm64'
-        else:
-            self.arch = 'amd64'
+        self.system = SYSTEM
+        self.arch = 'arm64' if ARCH == 'arm64' else 'amd64'
     
     def get_download_url(self) -> str:
         """获取Go下载链接"""
-        if self.system == 'windows':
-            return f"https://go.dev/dl/go{self.GO_VERSION}.windows-{self.arch}.msi"
-        elif self.system == 'darwin':  # macOS
-            return f"https://go.dev/dl/go{self.GO_VERSION}.darwin-{self.arch}.pkg"
-        else:  # Linux
-            return f"https://go.dev/dl/go{self.GO_VERSION}.linux-{self.arch}.tar.gz"
+        template = self._URL_TEMPLATES.get(self.system, self._URL_TEMPLATES['linux'])
+        return template.format(version=self.GO_VERSION, arch=self.arch)
     
     def get_filename(self) -> str:
         """获取下载文件名"""
-        if self.system == 'windows':
-            return f"go{self.GO_VERSION}.windows-{self.arch}.msi"
-        elif self.system == 'darwin':
-            return f"go{self.GO_VERSION}.darwin-{self.arch}.pkg"
-        else:
-            return f"go{self.GO_VERSION}.linux-{self.arch}.tar.gz"
+        template = self._FILENAME_TEMPLATES.get(self.system, self._FILENAME_TEMPLATES['linux'])
+        return template.format(version=self.GO_VERSION, arch=self.arch)
+    
+    def get_prefetch_target(self, temp_dir: Path) -> Optional[Tuple[str, Path]]:
+        """获取可提前下载的安装包（Linux边下载边解压，不预下载）"""
+        if self.system not in ('windows', 'darwin'):
+            return None
+        return self.get_download_url(), temp_dir / self.get_filename()
     
     def download_and_install(self, temp_dir: Path) -> bool:
         """下载并安装Go"""
@@ -64,6 +94,10 @@ class GoDownloader(BaseDownloader):
             
             ui.print_info(f"正在下载 {self.name}...")
             
+            # Linux - tar.gz 边下载边解压，无需先保存压缩包
+            if self.system not in ('windows', 'darwin'):
+                return self._install_go_linux(download_url, temp_dir)
+            
             # 下载文件
             if not self.download_file(download_url, str(file_path)):
                 return False
@@ -74,12 +108,9 @@ class GoDownloader(BaseDownloader):
             if self.system == 'windows':
                 # ✅ Windows系统 - 使用专门的方法
                 success = self._install_go_windows(str(file_path))
-            elif self.system == 'darwin':
+            else:
                 # macOS
                 success = self.run_installer(str(file_path))
-            else:
-                # Linux - 需要手动解压和设置环境变量
-                success = self._install_go_linux(file_path, temp_dir)
             
             return success
             
@@ -116,7 +147,6 @@ class GoDownloader(BaseDownloader):
                     
                     # 等待安装完成并清理安装包
                     ui.print_info("等待安装程序完全退出...")
-                    import time
                     time.sleep(3)  # 等待3秒确保安装程序完全退出
                     
                     return True
@@ -145,7 +175,6 @@ class GoDownloader(BaseDownloader):
                     ui.print_info("注意：安装在后台进行，完成后请重新打开终端验证")
                     
                     # 等待一段时间让安装程序启动
-                    import time
                     time.sleep(2)
                     
                     return True
@@ -176,14 +205,14 @@ class GoDownloader(BaseDownloader):
             logger.error("安装程序运行异常", installer=msi_path, error=str(e))
             return False
     
-    def _install_go_linux(self, file_path: Path, temp_dir: Path) -> bool:
+    def _install_go_linux(self, download_url: str, temp_dir: Path) -> bool:
         """在Linux上安装Go"""
         try:
             ui.print_info("正在解压Go安装包...")
             
-            # 解压到临时目录
+            # 下载并解压到临时目录
             extract_dir = temp_dir / "go_extract"
-            if not self.extract_archive(str(file_path), str(extract_dir)):
+            if not self.stream_extract(download_url, str(extract_dir)):
                 return False
             
             # 查找Go目录
@@ -221,7 +250,6 @@ class GoDownloader(BaseDownloader):
                 if target_dir.exists():
                     ui.print_info("移除旧版本Go...")
                     try:
-                        import shutil
                         shutil.rmtree(target_dir)
                     except Exception as e:
                         ui.print_error(f"移除旧版本失败: {str(e)}")
@@ -229,7 +257,7 @@ class GoDownloader(BaseDownloader):
                 
                 # 移动新版本
                 try:
-                    import shutil
+                    # 同一文件系统时 shutil.move 直接重命名，否则复制后删除
                     shutil.move(str(go_dir), str(target_dir))
                 except Exception as e:
                     ui.print_error(f"移动Go目录失败: {str(e)}")
@@ -296,19 +324,8 @@ class GoDownloader(BaseDownloader):
     
     def check_installation(self) -> tuple[bool, str]:
         """检查Go是否已安装"""
-        try:
-            result = subprocess.run(
-                ["go", "version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                version = result.stdout.strip()
-                return True, f"Go 已安装，版本: {version}"
-            else:
-                return False, "Go 未安装"
-                
-        except Exception as e:
-            return False, f"检查Go安装状态时发生错误: {str(e)}"
\ No newline at end of file
+        return _probe_go_version()
+    
+    def clear_installation_cache(self):
+        """清除安装状态缓存"""
+        _probe_go_version.cache_clear()
@@ -3,37 +3,70 @@
 MongoDB下载器
 """
 
-import platform
 import os
+import shutil
 import subprocess
 import ctypes
-import requests
 import re
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import structlog
 
 from ...ui.interface import ui
-from .base_downloader import BaseDownloader
+from .base_downloader import ARCH, SYSTEM, BaseDownloader
 
 logger = structlog.get_logger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _probe_mongo_version() -> Tuple[bool, str]:
+    """探测MongoDB安装状态，结果在进程内缓存，安装完成后需调用 cache_clear()"""
+    try:
+        # 不在PATH中时无需启动子进程
+        if shutil.which("mongod") is None:
+            return False, "MongoDB 未安装"
+        
+        result = subprocess.run(
+            ["mongod", "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=10
+        )
+        
+        if result.returncode == 0:
+            # 只显示第一行版本信息，后面是完整的构建信息
+            version_line = result.stdout.strip().split('\n', 1)[0]
+            return True, f"MongoDB 已安装，版本: {version_line}"
+        else:
+            return False, "MongoDB 未安装"
+            
+    except Exception as e:
+        return False, f"检查MongoDB安装状态时发生错误: {str(e)}"
+
+
 class MongoDBDownloader(BaseDownloader):
     """MongoDB下载器"""
     
+    # 各平台下载链接与文件名模板，未列出的平台按Linux处理
+    # MongoDB 7.0+ MSI on Windows usually requires -signed suffix
+    _URL_TEMPLATES = {
+        'windows': "https://fastdl.mongodb.org/windows/mongodb-windows-x86_64-{version}-signed.msi",
+        'darwin': "https://fastdl.mongodb.org/macos/mongodb-macos-{arch}-{version}.dmg",
+        'linux': "https://fastdl.mongodb.org/linux/mongodb-linux-{arch}-{version}.tgz",
+    }
+    _FILENAME_TEMPLATES = {
+        'windows': "mongodb-windows-x86_64-{version}-signed.msi",
+        'darwin': "mongodb-macos-{arch}-{version}.dmg",
+        'linux': "mongodb-linux-{arch}-{version}.tgz",
+    }
+    
     def __init__(self):
         super().__init__("MongoDB")
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
-        
-        # 标准化架构名称
-        if self.arch in ['x86_64', 'amd64']:
-            self.arch = 'x86_64'
-        elif self.arch in ['arm64', 'aarch64']:
-            self.arch = 'arm64'
-        else:
-            self.arch = 'x86_64'
+        self.system = SYSTEM
+        self.arch = ARCH
         
         self.selected_version = None
 
@@ -49,8 +82,6 @@ class MongoDBDownloader(BaseDownloader):
 
     def fetch_versions(self) -> List[str]:
         """从GitHub API获取版本列表，带重试机制"""
-        import time
-        
         url = "https://api.github.com/repos/mongodb/mongo/tags"
         max_retries = 3
         retry_delay = 5  # 秒
@@ -62,7 +93,7 @@ class MongoDBDownloader(BaseDownloader):
                 else:
                     ui.print_info("正在从GitHub获取版本列表...")
                 
-                response = requests.get(url, timeout=10)
+                response = self._session.get(url, timeout=10)
                 response.raise_for_status()
                 tags = response.json()
                 versions = []
@@ -217,25 +248,16 @@ class MongoDBDownloader(BaseDownloader):
         if not version:
             version = self.selected_version or "7.0.4"
         
-        if self.system == 'windows':
-            # MongoDB 7.0+ MSI on Windows usually requires -signed suffix
-            return f"https://fastdl.mongodb.org/windows/mongodb-windows-x86_64-{version}-signed.msi"
-        elif self.system == 'darwin':  # macOS
-            return f"https://fastdl.mongodb.org/macos/mongodb-macos-{self.arch}-{version}.dmg"
-        else:  # Linux
-            return f"https://fastdl.mongodb.org/linux/mongodb-linux-{self.arch}-{version}.tgz"
+        template = self._URL_TEMPLATES.get(self.system, self._URL_TEMPLATES['linux'])
+        return template.format(version=version, arch=self.arch)
     
     def get_filename(self, version: Optional[str] = None) -> str:
         """获取下载文件名"""
         if not version:
             version = self.selected_version or "7.0.4"
         
-        if self.system == 'windows':
-            return f"mongodb-windows-x86_64-{version}-signed.msi"
-        elif self.system == 'darwin':
-            return f"mongodb-macos-{self.arch}-{version}.dmg"
-        else:
-            return f"mongodb-linux-{self.arch}-{version}.tgz"
+        template = self._FILENAME_TEMPLATES.get(self.system, self._FILENAME_TEMPLATES['linux'])
+        return template.format(version=version, arch=self.arch)
     
     def download_and_install(self, temp_dir: Path) -> bool:
         """下载并安装MongoDB"""
@@ -273,8 +295,7 @@ class MongoDBDownloader(BaseDownloader):
                 ui.print_info(f"请打开下载的文件: {file_path}")
                 if ui.confirm("是否打开MongoDB安装包？"):
                     try:
-                        import os
-                        os.system(f"open '{file_path}'")
+                        subprocess.Popen(["open", str(file_path)])
                         ui.print_info("已尝试打开安装包，请按照提示完成安装")
                         return True
                     except Exception as e:
@@ -324,7 +345,6 @@ class MongoDBDownloader(BaseDownloader):
                     
                     # 等待安装完成并清理安装包
                     ui.print_info("等待安装程序完全退出...")
-                    import time
                     time.sleep(3)  # 等待3秒确保安装程序完全退出
                     
                     return True
@@ -353,7 +373,6 @@ class MongoDBDownloader(BaseDownloader):
                     ui.print_info("注意：安装在后台进行，完成后请重新打开终端验证")
                     
                     # 等待一段时间让安装程序启动
-                    import time
                     time.sleep(2)
                     
                     return True
@@ -386,21 +405,8 @@ class MongoDBDownloader(BaseDownloader):
     
     def check_installation(self) -> tuple[bool, str]:
         """检查MongoDB是否已安装"""
-        try:
-            import subprocess
-            result = subprocess.run(
-                ["mongod", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                # 解析版本信息
-                version_line = result.stdout.split('\n')[0]
-                return True, f"MongoDB 已安装，版本: {version_line}"
-            else:
-                return False, "MongoDB 未安装"
-                
-        except Exception as e:
-            return False, f"检查MongoDB安装状态时发生错误: {str(e)}"
\ No newline at end of file
+        return _probe_mongo_version()
+    
+    def clear_installation_cache(self):
+        """清除安装状态缓存"""
+        _probe_mongo_version.cache_clear()
@@ -6,28 +6,58 @@ NapCat下载器
 
 import os
 import tempfile
+import time
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import TYPE_CHECKING, Optional, Dict, List
 import structlog
+from rich.table import Table
 
 from ...ui.interface import ui
 from .base_downloader import BaseDownloader
-from ...modules.deployment_core.napcat_deployer import NapCatDeployer
+
+# 部署模块在导入时即加载 requests/tqdm，只在真正获取版本或安装时才导入
+if TYPE_CHECKING:
+    from ...modules.deployment_core.napcat_deployer import NapCatDeployer
 
 logger = structlog.get_logger(__name__)
 
+# 版本名后缀 -> 版本类型，用于没有 type 字段的旧缓存数据
+_VERSION_TYPES = {
+    '-shell': '基础版',
+    '-framework-onekey': '有头一键包',
+    '-shell-onekey': '无头一键包',
+}
+
+
+def _classify_version(name: str) -> str:
+    """根据版本名后缀判断版本类型"""
+    for suffix, version_type in _VERSION_TYPES.items():
+        if name.endswith(suffix):
+            return version_type
+    return "未知"
+
+
+# 版本选择界面用到的配色键
+_COLOR_KEYS = ('table_header', 'primary', 'border', 'warning', 'info', 'success')
+
 
 class NapCatDownloader(BaseDownloader):
     """NapCat下载器"""
     
     def __init__(self):
         super().__init__("NapCat")
-        self.napcat_deployer = NapCatDeployer()
+        self._napcat_deployer: Optional["NapCatDeployer"] = None
+    
+    @property
+    def napcat_deployer(self) -> "NapCatDeployer":
+        """NapCat部署器，首次访问时才创建"""
+        if self._napcat_deployer is None:
+            from ...modules.deployment_core.napcat_deployer import NapCatDeployer
+            self._napcat_deployer = NapCatDeployer()
+        return self._napcat_deployer
     
     def get_napcat_versions(self) -> List[Dict]:
         """获取NapCat版本列表"""
-        import time
-        
         # 重试配置
         max_retries = 3
         retry_delay = 5  # 秒
@@ -70,6 +100,7 @@ class NapCatDownloader(BaseDownloader):
         return [
             {
                 "name": "v4.8.90-shell",
+                "type": "基础版",
                 "display_name": "v4.8.90 基础版 (推荐)",
                 "description": "最推荐的版本，适合大多数用户",
                 "download_url": "https://github.com/NapNeko/NapCatQQ/releases/download/v4.8.90/NapCat.Shell.zip",
@@ -78,6 +109,7 @@ class NapCatDownloader(BaseDownloader):
             },
             {
                 "name": "v4.8.90-framework-onekey",
+                "type": "有头一键包",
                 "display_name": "v4.8.90 有头一键包",
                 "description": "带QQ界面的一键包版本，适合挂机器人的同时附体发消息",
                 "download_url": "https://github.com/NapNeko/NapCatQQ/releases/download/v4.8.90/NapCat.Framework.Windows.OneKey.zip",
@@ -86,6 +118,7 @@ class NapCatDownloader(BaseDownloader):
             },
             {
                 "name": "v4.8.90-shell-onekey",
+                "type": "无头一键包",
                 "display_name": "v4.8.90 无头一键包",
                 "description": "无界面的一键包版本",
                 "download_url": "https://github.com/NapNeko/NapCatQQ/releases/download/v4.8.90/NapCat.Shell.Windows.OneKey.zip",
@@ -94,15 +127,22 @@ class NapCatDownloader(BaseDownloader):
             }
         ]
     
-    def select_version(self) -> Optional[Dict]:
-        """选择NapCat版本"""
+    def select_version(self, versions: Optional[List[Dict]] = None) -> Optional[Dict]:
+        """选择NapCat版本
+        
+        Args:
+            versions: 已获取的版本列表，传入时首轮不再重复获取
+        """
         # 是否使用默认版本（重试耗尽的标记）
         using_fallback = False
+        # 选择界面用到的配色在重新获取版本时不变，只解析一次
+        colors = {key: ui.colors[key] for key in _COLOR_KEYS}
         
         while True:  # 外层循环，支持重新获取
             try:
-                # 获取版本列表
-                versions = self.get_napcat_versions()
+                # 获取版本列表（调用方已获取的列表只用于首轮，重新获取时置空）
+                if versions is None:
+                    versions = self.get_napcat_versions()
                 
                 if not versions:
                     ui.print_error("未找到可用的NapCat版本")
@@ -122,26 +162,23 @@ class NapCatDownloader(BaseDownloader):
                 ui.components.show_title("选择NapCat版本", symbol="🐱")
                 
                 # 创建版本表格
-                from rich.table import Table
                 table = Table(
                     show_header=True,
-                    header_style=ui.colors["table_header"],
+                    header_style=colors["table_header"],
                     title="[bold]NapCat 可用版本[/bold]",
-                    title_style=ui.colors["primary"],
-                    border_style=ui.colors["border"],
+                    title_style=colors["primary"],
+                    border_style=colors["border"],
                     show_lines=True
                 )
                 table.add_column("选项", style="cyan", width=6, justify="center")
-                table.add_column("版本", style=ui.colors["primary"], width=20)
+                table.add_column("版本", style=colors["primary"], width=20)
                 table.add_column("类型", style="yellow", width=15, justify="center")
                 table.add_column("说明", style="green")
                 
                 # 显示版本信息
                 for i, version in enumerate(versions, 1):
-                    # 提取版本类型
-                    version_type = "基础版" if "shell" in version["name"] and "onekey" not in version["name"] else \
-                                   "有头一键包" if "framework" in version["name"] else \
-                                   "无头一键包" if "shell" in version["name"] and "onekey" in version["name"] else "未知"
+                    # 版本类型在构建版本列表时已确定
+                    version_type = version.get("type") or _classify_version(version["name"])
                     
                     table.add_row(
                         f"[{i}]",
@@ -154,12 +191,13 @@ class NapCatDownloader(BaseDownloader):
                 
                 # 根据是否使用默认版本显示不同提示
                 if using_fallback:
-                    ui.console.print("\n[yellow]⚠ 由于网络问题，当前显示的是默认版本列表[/yellow]", style=ui.colors["warning"])
-                    ui.console.print("[Enter] 使用默认版本(第一个选项)  [R] 重新获取版本列表  [Q] 跳过NapCat下载", style=ui.colors["info"])
+                    ui.console.print("\n[yellow]⚠ 由于网络问题，当前显示的是默认版本列表[/yellow]", style=colors["warning"])
                 else:
-                    ui.console.print("\n[Enter] 使用默认版本(第一个选项)  [Q] 跳过NapCat下载", style=ui.colors["info"])
+                    ui.console.print("")
+                # 版本列表可能来自磁盘缓存，始终允许强制刷新
+                ui.console.print("[Enter] 使用默认版本(第一个选项)  [R] 重新获取版本列表  [Q] 跳过NapCat下载", style=colors["info"])
                 
-                ui.console.print("提示：推荐使用基础版，适合大多数用户", style=ui.colors["success"])
+                ui.console.print("提示：推荐使用基础版，适合大多数用户", style=colors["success"])
                 
                 while True:  # 内层循环，处理用户选择
                     choice = ui.get_input("请选择NapCat版本(直接回车使用默认版本)：").strip()
@@ -172,15 +210,13 @@ class NapCatDownloader(BaseDownloader):
                     if choice.upper() == 'Q':
                         return None
                     
-                    # 如果是默认版本列表，允许重新获取
-                    if choice.upper() == 'R' and using_fallback:
+                    # 重新获取版本列表（同时清除内存和磁盘缓存）
+                    if choice.upper() == 'R':
                         ui.print_info("正在重新获取版本列表...")
                         # 清除缓存，强制刷新
                         self.napcat_deployer.clear_napcat_versions_cache()
+                        versions = None
                         break  # 跳出内层循环，重新获取版本
-                    elif choice.upper() == 'R' and not using_fallback:
-                        ui.print_warning("当前版本列表是最新的，无需刷新")
-                        continue
                     
                     try:
                         choice_num = int(choice)
@@ -191,10 +227,7 @@ class NapCatDownloader(BaseDownloader):
                         else:
                             ui.print_error("无效选项，请重新选择")
                     except ValueError:
-                        if using_fallback:
-                            ui.print_error("请输入有效的数字、直接回车使用默认版本、或输入 R 重新获取")
-                        else:
-                            ui.print_error("请输入有效的数字或直接回车使用默认版本")
+                        ui.print_error("请输入有效的数字、直接回车使用默认版本、或输入 R 重新获取")
                         
             except Exception as e:
                 ui.print_error(f"选择NapCat版本时发生错误：{str(e)}")
@@ -212,7 +245,6 @@ class NapCatDownloader(BaseDownloader):
             
             # 让用户指定下载目标路径
             # 获取用户下载文件夹路径
-            import os
             user_downloads = Path.home() / "Downloads" / "NapCat"
             
             ui.print_info("\n请指定NapCat的下载目标路径")
@@ -264,38 +296,29 @@ class NapCatDownloader(BaseDownloader):
                 
                 ui.print_info(f"开始下载NapCat {selected_version['display_name']}...")
                 
-                # 下载文件
-                if not self.download_file(download_url, str(temp_file)):
-                    return False
-                
-                ui.print_info("正在解压NapCat到目标目录...")
-                
+                # 解压时记录成员名，之后据此查找安装程序
+                member_names = [asset_name]
                 if asset_name.endswith('.zip'):
-                    import zipfile
-                    with zipfile.ZipFile(temp_file, 'r') as zip_ref:
-                        zip_ref.extractall(napcat_folder)
+                    # 边下载边解压到目标目录（发布信息带有摘要时同步校验）
+                    if not self.stream_extract_zip(download_url, str(temp_file), str(napcat_folder),
+                                                   sha256=selected_version.get("sha256"),
+                                                   member_names=member_names):
+                        return False
                 else:
+                    # 下载文件（发布信息带有摘要时同步校验）
+                    if not self.download_file(download_url, str(temp_file), sha256=selected_version.get("sha256")):
+                        return False
                     # 如果不是zip文件，直接复制
-                    import shutil
-                    shutil.copy2(temp_file, napcat_folder)
+                    self.copy_file(str(temp_file), str(napcat_folder))
                 
                 ui.print_success(f"NapCat下载完成！文件位置: {napcat_folder}")
                 logger.info("NapCat下载成功", version=selected_version['display_name'], path=str(napcat_folder))
                 
                 # 查找NapCat安装程序
-                installer_exe = None
-                
-                for root, dirs, files in os.walk(napcat_folder):
-                    for file in files:
-                        # 查找安装程序
-                        if file.lower() == 'napcatinstaller.exe':
-                            installer_exe = os.path.join(root, file)
-                            break
-                    if installer_exe:
-                        break
+                installer_exe = self._find_installer(napcat_folder, member_names)
                 
                 # 如果找到安装程序，询问是否自动安装
-                if installer_exe and os.path.exists(installer_exe):
+                if installer_exe:
                     ui.print_info(f"\n找到NapCat安装程序: {installer_exe}")
                     
                     if ui.confirm("是否自动运行NapCat安装程序？"):
@@ -320,6 +343,18 @@ class NapCatDownloader(BaseDownloader):
             logger.error("NapCat下载安装失败", error=str(e))
             return False
     
+    def _find_installer(self, extract_dir: Path, member_names: List[str]) -> Optional[str]:
+        """在解压出的成员名中查找 NapCatInstaller.exe（不区分大小写），无需遍历解压目录
+        
+        只返回确实已解压到磁盘上的文件，跳过或解压失败的成员不会被当作安装程序
+        """
+        for name in member_names:
+            if os.path.basename(name).lower() == 'napcatinstaller.exe':
+                candidate = extract_dir / name
+                if candidate.is_file():
+                    return str(candidate)
+        return None
+    
     def _run_installer(self, installer_path: str, extract_dir: Path) -> bool:
         """运行NapCat安装程序"""
         try:
@@ -356,8 +391,8 @@ class NapCatDownloader(BaseDownloader):
                 ui.print_error("未找到可用的NapCat版本")
                 return False
             
-            # 让用户选择版本
-            selected_version = self.select_version()
+            # 让用户选择版本，复用上面的版本列表
+            selected_version = self.select_version(versions)
             if not selected_version:
                 ui.print_info("用户取消了版本选择")
                 return True
@@ -382,21 +417,17 @@ class NapCatDownloader(BaseDownloader):
                 
                 ui.print_info(f"正在下载NapCat {version['display_name']}...")
                 
-                # 下载文件
-                if not self.download_file(download_url, str(temp_file)):
-                    return False
-                
-                # 解压到目标目录
-                ui.print_info("正在解压NapCat文件...")
-                
                 if asset_name.endswith('.zip'):
-                    import zipfile
-                    with zipfile.ZipFile(temp_file, 'r') as zip_ref:
-                        zip_ref.extractall(target_dir)
+                    # 边下载边解压到目标目录（发布信息带有摘要时同步校验）
+                    if not self.stream_extract_zip(download_url, str(temp_file), str(target_dir),
+                                                   sha256=version.get("sha256")):
+                        return False
                 else:
+                    # 下载文件（发布信息带有摘要时同步校验）
+                    if not self.download_file(download_url, str(temp_file), sha256=version.get("sha256")):
+                        return False
                     # 如果不是zip文件，直接复制
-                    import shutil
-                    shutil.copy2(temp_file, target_dir / asset_name)
+                    self.copy_file(str(temp_file), str(target_dir / asset_name))
                 
                 ui.print_success(f"NapCat {version['display_name']} 已下载到: {target_dir}")
                 logger.info("NapCat版本下载成功", version=version['display_name'], path=str(target_dir))
@@ -3,16 +3,18 @@
 Node.js下载器
 """
 
-import platform
 import os
+import shutil
 import subprocess
 import ctypes
+import time
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 import structlog
 
 from ...ui.interface import ui
-from .base_downloader import BaseDownloader
+from .base_downloader import ARCH, SYSTEM, BaseDownloader
 
 logger = structlog.get_logger(__name__)
 
@@ -22,16 +24,8 @@ class NodeJSDownloader(BaseDownloader):
     
     def __init__(self):
         super().__init__("Node.js")
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
-        
-        # 标准化架构名称
-        if self.arch in ['x86_64', 'amd64']:
-            self.arch = 'x64'
-        elif self.arch in ['arm64', 'aarch64']:
-            self.arch = 'arm64'
-        else:
-            self.arch = 'x64'  # 默认使用x64
+        self.system = SYSTEM
+        self.arch = 'arm64' if ARCH == 'arm64' else 'x64'
     
     def get_download_url(self) -> str:
         """获取Node.js下载链接"""
@@ -52,6 +46,10 @@ class NodeJSDownloader(BaseDownloader):
         else:
             return f"nodejs-v20.11.0-{self.arch}.tar.gz"
     
+    def get_prefetch_target(self, temp_dir: Path) -> Optional[Tuple[str, Path]]:
+        """获取可提前下载的安装包"""
+        return self.get_download_url(), temp_dir / self.get_filename()
+    
     def download_and_install(self, temp_dir: Path) -> bool:
         """下载并安装Node.js"""
         try:
@@ -111,26 +109,18 @@ class NodeJSDownloader(BaseDownloader):
             make_cmd = ["make", "-j", str(os.cpu_count() or 4)]
             install_cmd = ["sudo", "make", "install"]
             
-            # 运行配置
-            ui.print_info("运行 ./configure...")
-            result = subprocess.run(configure_cmd, cwd=source_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                ui.print_error(f"配置失败: {result.stderr}")
-                return False
-            
-            # 编译
-            ui.print_info("编译Node.js...")
-            result = subprocess.run(make_cmd, cwd=source_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                ui.print_error(f"编译失败: {result.stderr}")
-                return False
-            
-            # 安装
-            ui.print_info("安装Node.js...")
-            result = subprocess.run(install_cmd, cwd=source_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                ui.print_error(f"安装失败: {result.stderr}")
-                return False
+            # 依次运行配置、编译、安装，输出实时显示，只保留末尾若干行用于报错
+            steps = [
+                ("运行 ./configure...", configure_cmd, "配置失败"),
+                ("编译Node.js...", make_cmd, "编译失败"),
+                ("安装Node.js...", install_cmd, "安装失败"),
+            ]
+            for message, cmd, error_message in steps:
+                ui.print_info(message)
+                returncode, tail = self._run_streaming(cmd, source_dir)
+                if returncode != 0:
+                    ui.print_error(f"{error_message}: {tail}")
+                    return False
             
             ui.print_success(f"{self.name} 安装完成")
             return True
@@ -140,14 +130,39 @@ class NodeJSDownloader(BaseDownloader):
             logger.error("Node.js源码安装失败", error=str(e))
             return False
     
+    def _run_streaming(self, cmd: List[str], cwd: Path, tail_lines: int = 200) -> Tuple[int, str]:
+        """运行命令并逐行输出，返回 (返回码, 最后 tail_lines 行输出)"""
+        tail = deque(maxlen=tail_lines)
+        with subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
+            text=True,
+            errors="replace"
+        ) as process:
+            for line in process.stdout:
+                tail.append(line)
+                # 编译输出量很大，直接打印到终端，不逐行写入日志
+                ui.console.print(line.rstrip(), markup=False, highlight=False)
+            returncode = process.wait()
+        return returncode, "".join(tail)
+    
     def check_installation(self) -> tuple[bool, str]:
         """检查Node.js是否已安装"""
         try:
+            # 不在PATH中时无需启动子进程
+            if shutil.which("node") is None:
+                return False, "Node.js 未安装"
+            
             result = subprocess.run(
                 ["node", "--version"],
                 capture_output=True,
                 text=True,
-                timeout=10
+                timeout=10,
+                # Windows上不弹出控制台窗口
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
             )
             
             if result.returncode == 0:
@@ -189,7 +204,6 @@ class NodeJSDownloader(BaseDownloader):
                     
                     # 等待安装完成并清理安装包
                     ui.print_info("等待安装程序完全退出...")
-                    import time
                     time.sleep(3)  # 等待3秒确保安装程序完全退出
                     
                     return True
@@ -218,7 +232,6 @@ class NodeJSDownloader(BaseDownloader):
                     ui.print_info("注意：安装在后台进行，完成后请重新打开终端验证")
                     
                     # 等待一段时间让安装程序启动
-                    import time
                     time.sleep(2)
                     
                     return True
@@ -4,17 +4,18 @@ Python下载器
 使用本地安装包
 """
 
+import fnmatch
 import os
-import platform
 import shutil
 import subprocess
 import ctypes
+import time
 from pathlib import Path
 from typing import Optional
 import structlog
 
 from ...ui.interface import ui
-from .base_downloader import BaseDownloader
+from .base_downloader import ARCH, SYSTEM, BaseDownloader
 
 logger = structlog.get_logger(__name__)
 
@@ -24,16 +25,8 @@ class PythonDownloader(BaseDownloader):
     
     def __init__(self):
         super().__init__("Python")
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
-        
-        # 标准化架构名称
-        if self.arch in ['x86_64', 'amd64']:
-            self.arch = 'amd64'
-        elif self.arch in ['arm64', 'aarch64']:
-            self.arch = 'arm64'
-        else:
-            self.arch = 'amd64'  # 默认使用amd64
+        self.system = SYSTEM
+        self.arch = 'arm64' if ARCH == 'arm64' else 'amd64'
     
     def get_local_installer_path(self) -> Optional[Path]:
         """获取本地安装包路径"""
@@ -52,12 +45,16 @@ class PythonDownloader(BaseDownloader):
             "python*.exe"
         ]
         
+        # 只读取一次目录，DirEntry 的 stat 结果会被缓存（Windows上无需额外系统调用）
+        with os.scandir(install_dir) as entries:
+            files = [(entry.name, entry.path, entry.stat().st_mtime) for entry in entries if entry.is_file()]
+        
         for pattern in python_patterns:
-            matches = list(install_dir.glob(pattern))
+            # fnmatch 与 glob 相同，按平台规则决定是否区分大小写
+            matches = [file for file in files if fnmatch.fnmatch(file[0], pattern)]
             if matches:
                 # 选择最新的版本
-                matches.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-                return matches[0]
+                return Path(max(matches, key=lambda file: file[2])[1])
         
         ui.print_error("未找到Python安装包")
         logger.error("Python本地安装包未找到", install_dir=str(install_dir))
@@ -113,7 +110,7 @@ class PythonDownloader(BaseDownloader):
             
             # 如果是Windows系统，直接复制安装包
             if self.system == 'windows':
-                shutil.copy2(local_installer, temp_installer)
+                self.copy_file(str(local_installer), str(temp_installer))
                 ui.print_info(f"已复制安装包到: {temp_installer}")
                 
                 # ✅ 运行安装程序 - 使用专门的方法
@@ -129,9 +126,9 @@ class PythonDownloader(BaseDownloader):
                 if ui.confirm("是否打开Python安装包？"):
                     try:
                         if self.system == 'darwin':  # macOS
-                            os.system(f"open '{local_installer}'")
+                            subprocess.Popen(["open", str(local_installer)])
                         elif self.system == 'linux':
-                            os.system(f"xdg-open '{local_installer}'")
+                            subprocess.Popen(["xdg-open", str(local_installer)])
                         else:
                             os.startfile(str(local_installer))
                         
@@ -175,37 +172,20 @@ class PythonDownloader(BaseDownloader):
     def check_installation(self) -> tuple[bool, str]:
         """检查Python是否已安装"""
         try:
-            # 检查Python命令
-            result = subprocess.run(
-                ["python", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                version = result.stdout.strip()
-                return True, f"Python 已安装，版本: {version}"
-            
-            # 检查python3命令
-            result = subprocess.run(
-                ["python3", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                version = result.stdout.strip()
-                return True, f"Python 已安装，版本: {version}"
-            
-            # 检查py命令（Windows）
-            if self.system == 'windows':
+            # py 启动器只存在于Windows
+            commands = ["python", "python3", "py"] if self.system == 'windows' else ["python", "python3"]
+            for command in commands:
+                # 不在PATH中时无需启动子进程
+                if shutil.which(command) is None:
+                    continue
+                
                 result = subprocess.run(
-                    ["py", "--version"],
+                    [command, "--version"],
                     capture_output=True,
                     text=True,
-                    timeout=10
+                    timeout=10,
+                    # Windows上不弹出控制台窗口
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
                 )
                 
                 if result.returncode == 0:
@@ -257,7 +237,6 @@ class PythonDownloader(BaseDownloader):
                     
                     # 等待安装完成并清理安装包
                     ui.print_info("等待安装程序完全退出...")
-                    import time
                     time.sleep(3)  # 等待3秒确保安装程序完全退出
                     
                     return True
@@ -286,7 +265,6 @@ class PythonDownloader(BaseDownloader):
                     ui.print_info("注意：安装在后台进行，完成后请重新打开终端验证")
                     
                     # 等待一段时间让安装程序启动
-                    import time
                     time.sleep(2)
                     
                     return True
@@ -4,13 +4,13 @@ SQLiteStudio下载器
 """
 
 import os
-import platform
+import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 import structlog
 
 from ...ui.interface import ui
-from .base_downloader import BaseDownloader
+from .base_downloader import ARCH, SYSTEM, BaseDownloader
 
 logger = structlog.get_logger(__name__)
 
@@ -20,16 +20,8 @@ class SQLiteStudioDownloader(BaseDownloader):
     
     def __init__(self):
         super().__init__("SQLiteStudio")
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
-        
-        # 标准化架构名称
-        if self.arch in ['x86_64', 'amd64']:
-            self.arch = 'x86_64'
-        elif self.arch in ['arm64', 'aarch64']:
-            self.arch = 'arm64'
-        else:
-            self.arch = 'x86_64'
+        self.system = SYSTEM
+        self.arch = ARCH
     
     def get_download_url(self) -> str:
         """获取SQLiteStudio下载链接"""
@@ -57,6 +49,10 @@ class SQLiteStudioDownloader(BaseDownloader):
         else:
             return f"SQLiteStudio-{version}.tar.gz"
     
+    def get_prefetch_target(self, temp_dir: Path) -> Optional[Tuple[str, Path]]:
+        """获取可提前下载的安装包"""
+        return self.get_download_url(), temp_dir / self.get_filename()
+    
     def download_and_install(self, temp_dir: Path) -> bool:
         """下载并安装SQLiteStudio"""
         try:
@@ -99,8 +95,7 @@ class SQLiteStudioDownloader(BaseDownloader):
                 ui.print_info(f"请打开下载的文件: {file_path}")
                 if ui.confirm("是否打开SQLiteStudio安装包？"):
                     try:
-                        import os
-                        os.system(f"open '{file_path}'")
+                        subprocess.Popen(["open", str(file_path)])
                         ui.print_info("已尝试打开安装包，请按照提示完成安装")
                         return True
                     except Exception as e:
@@ -140,9 +135,6 @@ class SQLiteStudioDownloader(BaseDownloader):
     def _create_desktop_shortcut(self, exe_path: Path):
         """创建桌面快捷方式"""
         try:
-            import os
-            from pathlib import Path
-            
             # 获取桌面路径
             desktop = Path.home() / "Desktop"
             if not desktop.exists():
@@ -181,8 +173,6 @@ Categories=Development;Database;
     def check_installation(self) -> tuple[bool, str]:
         """检查SQLiteStudio是否已安装"""
         try:
-            import subprocess
-            
             # 检查常见安装位置
             possible_paths = [
                 "sqlitestudio",
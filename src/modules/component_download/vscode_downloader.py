@@ -3,44 +3,126 @@
 Visual Studio Code下载器
 """
 
-import platform
 import os
 import subprocess
 import ctypes
-import requests
+import shutil
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import structlog
 
 from ...ui.interface import ui
-from .base_downloader import BaseDownloader
+from .base_downloader import ARCH, SYSTEM, BaseDownloader
 
 logger = structlog.get_logger(__name__)
 
 
+_UNINSTALL_KEY = r"Software\Microsoft\Windows\CurrentVersion\Uninstall"
+
+
+@lru_cache(maxsize=1)
+def _enumerate_uninstall_keys() -> Dict[str, str]:
+    """一次性读取当前用户和本机（含32位视图）的卸载信息，返回 DisplayName -> DisplayVersion"""
+    import winreg
+    
+    entries = {}
+    hives = (
+        (winreg.HKEY_CURRENT_USER, 0),
+        (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_64KEY),
+        (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_32KEY),
+    )
+    for hive, view in hives:
+        try:
+            uninstall = winreg.OpenKey(hive, _UNINSTALL_KEY, 0, winreg.KEY_READ | view)
+        except OSError:
+            continue
+        with uninstall:
+            subkey_count = winreg.QueryInfoKey(uninstall)[0]
+            for index in range(subkey_count):
+                try:
+                    with winreg.OpenKey(uninstall, winreg.EnumKey(uninstall, index)) as key:
+                        name, _ = winreg.QueryValueEx(key, "DisplayName")
+                        try:
+                            version, _ = winreg.QueryValueEx(key, "DisplayVersion")
+                        except OSError:
+                            version = ""
+                except OSError:
+                    continue
+                entries.setdefault(str(name), str(version))
+    return entries
+
+
+@lru_cache(maxsize=1)
+def _probe_vscode_version() -> Tuple[bool, str]:
+    """探测VSCode安装状态，结果在进程内缓存，安装完成后需调用 cache_clear()"""
+    try:
+        if SYSTEM == 'windows':
+            # Windows - 先查卸载信息（用户安装为 "Microsoft Visual Studio Code (User)"），命中时无需启动子进程
+            for name, version in _enumerate_uninstall_keys().items():
+                if name.startswith("Microsoft Visual Studio Code"):
+                    return True, f"VSCode 已安装，版本: {version}"
+        
+        # 检查code命令，不在PATH中时无需启动子进程
+        code_path = shutil.which("code")
+        if code_path is None:
+            return False, "VSCode 未安装"
+        
+        # 直接执行查找到的路径：Windows上的 code 是 code.cmd，按命令名无法直接启动
+        result = subprocess.run(
+            [code_path, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        
+        if result.returncode == 0:
+            version = result.stdout.strip()
+            return True, f"VSCode 已安装，版本: {version}"
+        else:
+            return False, "VSCode 未安装"
+            
+    except Exception as e:
+        return False, f"检查VSCode安装状态时发生错误: {str(e)}"
+
+
 class VSCODEDownloader(BaseDownloader):
     """Visual Studio Code下载器"""
     
+    DEFAULT_VERSION = "1.106.3"
+    
+    # 各平台官方下载链接与文件名模板，未列出的平台按Linux处理
+    _URL_TEMPLATES = {
+        'windows': "https://update.code.visualstudio.com/{version}/win32-x64/stable",
+        'darwin': "https://update.code.visualstudio.com/{version}/darwin-{arch}/stable",
+        'linux': "https://update.code.visualstudio.com/{version}/linux-x64/stable",
+    }
+    _ASSET_TEMPLATES = {
+        'windows': "VSCode-win32-x64-{version}.exe",
+        'darwin': "VSCode-darwin-{arch}-{version}.zip",
+        'linux': "vscode-linux-x64-{version}.tar.gz",
+    }
+    _FILENAME_TEMPLATES = {
+        'windows': "VSCodeSetup-x64.exe",
+        'darwin': "VSCode-darwin-{arch}.zip",
+        'linux': "vscode-x64.tar.gz",
+    }
+    
     def __init__(self):
         super().__init__("VSCode")
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
-        
-        # 标准化架构名称
-        if self.arch in ['x86_64', 'amd64']:
-            self.arch = 'x64'
-        elif self.arch in ['arm64', 'aarch64']:
-            self.arch = 'arm64'
-        else:
-            self.arch = 'x64'
+        self.system = SYSTEM
+        self.arch = 'arm64' if ARCH == 'arm64' else 'x64'
     
     def get_vscode_versions(self) -> List[Dict]:
         """获取VSCode版本列表"""
+        import requests
+        
         try:
             ui.print_info("正在获取VSCode最新版本信息...")
             
             # GitHub API获取releases - VSCode不在GitHub发布资产，只获取版本信息
-            response = requests.get(
+            # 走共享会话，与之后的安装包下载复用连接池
+            response = self._session.get(
                 "https://api.github.com/repos/microsoft/vscode/releases",
                 timeout=10
             )
@@ -49,6 +131,8 @@ class VSCODEDownloader(BaseDownloader):
             releases = response.json()
             ui.print_info(f"获取到 {len(releases)} 个发布版本")
             versions = []
+            url_template = self._URL_TEMPLATES.get(self.system, self._URL_TEMPLATES['linux'])
+            asset_template = self._ASSET_TEMPLATES.get(self.system, self._ASSET_TEMPLATES['linux'])
             
             # 处理前10个版本
             for i, release in enumerate(releases[:10]):
@@ -66,15 +150,8 @@ class VSCODEDownloader(BaseDownloader):
                 
                 # VSCode使用官方下载服务器，不依赖GitHub assets
                 # 构建官方下载URL
-                if self.system == 'windows':
-                    download_url = f"https://update.code.visualstudio.com/{tag_name}/win32-x64/stable"
-                    asset_name = f"VSCode-win32-x64-{tag_name}.exe"
-                elif self.system == 'darwin':
-                    download_url = f"https://update.code.visualstudio.com/{tag_name}/darwin-{self.arch}/stable"
-                    asset_name = f"VSCode-darwin-{self.arch}-{tag_name}.zip"
-                else:
-                    download_url = f"https://update.code.visualstudio.com/{tag_name}/linux-x64/stable"
-                    asset_name = f"vscode-linux-x64-{tag_name}.tar.gz"
+                download_url = url_template.format(version=tag_name, arch=self.arch)
+                asset_name = asset_template.format(version=tag_name, arch=self.arch)
                 
                 versions.append({
                     "name": tag_name,
@@ -189,23 +266,13 @@ class VSCODEDownloader(BaseDownloader):
     
     def get_download_url(self) -> str:
         """获取VSCode下载链接（兼容性方法）"""
-        version = "1.106.3"
-        
-        if self.system == 'windows':
-            return f"https://update.code.visualstudio.com/{version}/win32-x64/stable"
-        elif self.system == 'darwin':  # macOS
-            return f"https://update.code.visualstudio.com/{version}/darwin-{self.arch}/stable"
-        else:  # Linux
-            return f"https://update.code.visualstudio.com/{version}/linux-x64/stable"
+        template = self._URL_TEMPLATES.get(self.system, self._URL_TEMPLATES['linux'])
+        return template.format(version=self.DEFAULT_VERSION, arch=self.arch)
     
     def get_filename(self) -> str:
         """获取下载文件名（兼容性方法）"""
-        if self.system == 'windows':
-            return "VSCodeSetup-x64.exe"
-        elif self.system == 'darwin':
-            return f"VSCode-darwin-{self.arch}.zip"
-        else:
-            return "vscode-x64.tar.gz"
+        template = self._FILENAME_TEMPLATES.get(self.system, self._FILENAME_TEMPLATES['linux'])
+        return template.format(arch=self.arch)
     
     def download_and_install(self, temp_dir: Path) -> bool:
         """下载并安装VSCode"""
@@ -223,20 +290,18 @@ class VSCODEDownloader(BaseDownloader):
             
             ui.print_info(f"正在下载 {self.name} {selected_version['display_name']}...")
             
-            # 下载文件
-            if not self.download_file(download_url, str(file_path)):
-                return False
-            
-            ui.print_info(f"正在安装 {self.name}...")
-            
             # 根据系统执行安装
             if self.system == 'windows':
-                # Windows系统
+                # Windows系统 - 下载安装程序后运行
+                if not self.download_file(download_url, str(file_path)):
+                    return False
+                
+                ui.print_info(f"正在安装 {self.name}...")
                 success = self.run_installer(str(file_path))
             elif self.system == 'darwin':
-                # macOS - 需要解压后安装
+                # macOS - 边下载边解压，不必等下载完成后再整体解压一遍
                 extract_dir = temp_dir / "vscode_extract"
-                if self.extract_archive(str(file_path), str(extract_dir)):
+                if self.stream_extract_zip(download_url, str(file_path), str(extract_dir)):
                     # 查找.app文件
                     app_files = list(extract_dir.glob("*.app"))
                     if app_files:
@@ -249,9 +314,9 @@ class VSCODEDownloader(BaseDownloader):
                 else:
                     success = False
             else:
-                # Linux - 解压到指定位置
+                # Linux - tar.gz 边下载边解压，数据不落地为临时压缩包
                 extract_dir = temp_dir / "vscode_extract"
-                if self.extract_archive(str(file_path), str(extract_dir)):
+                if self.stream_extract(download_url, str(extract_dir)):
                     ui.print_info("正在安装VSCode到系统...")
                     # 这里可以添加安装到/usr/local的逻辑
                     success = True
@@ -267,47 +332,10 @@ class VSCODEDownloader(BaseDownloader):
     
     def check_installation(self) -> tuple[bool, str]:
         """检查VSCode是否已安装"""
-        try:
-            if self.system == 'windows':
-                # Windows - 检查注册表
-                import winreg
-                try:
-                    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Uninstall\Microsoft VSCode") as key:
-                        version, _ = winreg.QueryValueEx(key, "DisplayVersion")
-                        return True, f"VSCode 已安装，版本: {version}"
-                except:
-                    pass
-                
-                # 检查可执行文件
-                import subprocess
-                result = subprocess.run(
-                    ["code", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0:
-                    version = result.stdout.strip()
-                    return True, f"VSCode 已安装，版本: {version}"
-                else:
-                    return False, "VSCode 未安装"
-            
-            else:
-                # Linux/macOS - 检查code命令
-                import subprocess
-                result = subprocess.run(
-                    ["code", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0:
-                    version = result.stdout.strip()
-                    return True, f"VSCode 已安装，版本: {version}"
-                else:
-                    return False, "VSCode 未安装"
-                    
-        except Exception as e:
-            return False, f"检查VSCode安装状态时发生错误: {str(e)}"
\ No newline at end of file
+        return _probe_vscode_version()
+    
+    def clear_installation_cache(self):
+        """清除安装状态缓存"""
+        _probe_vscode_version.cache_clear()
+        if SYSTEM == 'windows':
+            _enumerate_uninstall_keys.cache_clear()
\ No newline at end of file
@@ -5,6 +5,7 @@ NapCat部署器
 可以引用napcat_downloader或独立实现
 """
 import fnmatch
+import json
 import os
 import platform
 import shutil
@@ -12,12 +13,13 @@ import subprocess
 import tempfile
 import time
 import zipfile
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import structlog
 import requests
 
 from .base_deployer import BaseDeployer
 from ...ui.interface import ui
+from ...utils.common import write_text_atomic
 
 logger = structlog.get_logger(__name__)
 
@@ -25,6 +27,10 @@ logger = structlog.get_logger(__name__)
 class NapCatDeployer(BaseDeployer):
     """NapCat部署器"""
     
+    # 版本列表磁盘缓存，跨进程复用，避免每次运行都请求GitHub API
+    VERSIONS_CACHE_FILE = "config/cache/napcat_versions.json"
+    VERSIONS_CACHE_TTL = 3600  # 1小时
+    
     def __init__(self):
         super().__init__()
         self.napcat_repo = "NapNeko/NapCatQQ"
@@ -44,6 +50,15 @@ class NapCatDeployer(BaseDeployer):
         if not force_refresh and self._is_cache_valid() and self._napcat_versions_cache:
             return self._napcat_versions_cache
         
+        if not force_refresh:
+            cached = self._load_versions_from_disk()
+            if cached:
+                cached_versions, fetched_at = cached
+                self._napcat_versions_cache = cached_versions
+                # 按磁盘缓存的写入时间（即实际获取版本列表的时间）计时，读取缓存不延长有效期
+                self._cache_timestamp = fetched_at
+                return cached_versions
+        
         # 重试配置
         max_retries = 3
         retry_delay = 2  # 秒
@@ -94,6 +109,7 @@ class NapCatDeployer(BaseDeployer):
                     for asset in shell_assets:
                         napcat_versions.append({
                             "name": f"{tag_name}-shell",
+                            "type": "基础版",
                             "display_name": f"{tag_name} 基础版 (推荐)",
                             "description": "最推荐的版本，适合大多数用户",
                             "published_at": release.get("published_at", ""),
@@ -101,6 +117,7 @@ class NapCatDeployer(BaseDeployer):
                             "size": asset.get("size", 0),
                             "changelog": release.get("body", "暂无更新日志"),
                             "asset_name": asset.get("name", ""),
+                            "sha256": self._asset_sha256(asset),
                             "version": tag_name
                         })
                     
@@ -108,6 +125,7 @@ class NapCatDeployer(BaseDeployer):
                     for asset in framework_onekey_assets:
                         napcat_versions.append({
                             "name": f"{tag_name}-framework-onekey",
+                            "type": "有头一键包",
                             "display_name": f"{tag_name} 有头一键包",
                             "description": "带QQ界面的一键包版本，适合挂机器人的同时附体发消息",
                             "published_at": release.get("published_at", ""),
@@ -115,6 +133,7 @@ class NapCatDeployer(BaseDeployer):
                             "size": asset.get("size", 0),
                             "changelog": release.get("body", "暂无更新日志"),
                             "asset_name": asset.get("name", ""),
+                            "sha256": self._asset_sha256(asset),
                             "version": tag_name
                         })
                     
@@ -122,6 +141,7 @@ class NapCatDeployer(BaseDeployer):
                     for asset in shell_onekey_assets:
                         napcat_versions.append({
                             "name": f"{tag_name}-shell-onekey",
+                            "type": "无头一键包",
                             "display_name": f"{tag_name} 无头一键包",
                             "description": "无界面的一键包版本",
                             "published_at": release.get("published_at", ""),
@@ -129,12 +149,15 @@ class NapCatDeployer(BaseDeployer):
                             "size": asset.get("size", 0),
                             "changelog": release.get("body", "暂无更新日志"),
                             "asset_name": asset.get("name", ""),
+                            "sha256": self._asset_sha256(asset),
                             "version": tag_name
                         })
                 
                 # 更新缓存
                 self._napcat_versions_cache = napcat_versions
                 self._cache_timestamp = time.time()
+                if napcat_versions:
+                    self._save_versions_to_disk(napcat_versions)
                 
                 logger.info("成功获取NapCat版本列表", count=len(napcat_versions))
                 return napcat_versions
@@ -158,11 +181,42 @@ class NapCatDeployer(BaseDeployer):
         # 理论上不会到这里，但作为保险返回默认版本
         return self._get_default_napcat_versions()
     
+    @staticmethod
+    def _asset_sha256(asset: Dict) -> Optional[str]:
+        """从GitHub资产的 digest 字段（格式为 "sha256:<hex>"）中取出SHA-256，没有时返回None"""
+        digest = asset.get("digest") or ""
+        if digest.startswith("sha256:"):
+            return digest[len("sha256:"):]
+        return None
+    
+    def _load_versions_from_disk(self) -> Optional[Tuple[List[Dict], float]]:
+        """读取未过期的磁盘缓存，返回 (版本列表, 缓存写入时间)；不存在、已过期或损坏时返回None"""
+        try:
+            fetched_at = os.path.getmtime(self.VERSIONS_CACHE_FILE)
+            if time.time() - fetched_at >= self.VERSIONS_CACHE_TTL:
+                return None
+            with open(self.VERSIONS_CACHE_FILE, "r", encoding="utf-8") as f:
+                versions = json.load(f)
+            if not isinstance(versions, list):
+                return None
+            logger.info("使用NapCat版本列表磁盘缓存", count=len(versions))
+            return versions, fetched_at
+        except (OSError, ValueError):
+            return None
+    
+    def _save_versions_to_disk(self, versions: List[Dict]):
+        """写入磁盘缓存，先写临时文件再替换，避免并发读取到半个文件"""
+        try:
+            write_text_atomic(self.VERSIONS_CACHE_FILE, json.dumps(versions, ensure_ascii=False))
+        except OSError as e:
+            logger.warning("写入NapCat版本缓存失败", error=str(e))
+    
     def _get_default_napcat_versions(self) -> List[Dict]:
         """获取默认的NapCat版本列表"""
         napcat_versions = [
             {
                 "name": "v4.8.90-shell",
+                "type": "基础版",
                 "display_name": "v4.8.90 基础版 (推荐)",
                 "description": "基础版本，适合大多数用户",
                 "published_at": "2024-12-01T00:00:00Z",
@@ -477,4 +531,10 @@ class NapCatDeployer(BaseDeployer):
         """清除NapCat版本缓存"""
         self._napcat_versions_cache = None
         self._cache_timestamp = None
+        try:
+            os.remove(self.VERSIONS_CACHE_FILE)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("删除NapCat版本缓存失败", error=str(e))
         logger.info("NapCat版本缓存已清除")
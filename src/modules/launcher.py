@@ -2,12 +2,15 @@
 麦麦启动器模块
 负责启动和管理麦麦实例及其相关组件。
 """
+import atexit
 import os
 import shutil
 import subprocess
+import threading
 import time
 import webbrowser
 import structlog
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 import psutil
@@ -19,6 +22,23 @@ from ..utils.version_detector import is_legacy_version
 
 logger = structlog.get_logger(__name__)
 
+# 批量停止进程时的最大并发数
+_STOP_MAX_WORKERS = 8
+
+_stop_pool: Optional[ThreadPoolExecutor] = None
+_stop_pool_lock = threading.Lock()
+
+
+def _get_stop_pool() -> ThreadPoolExecutor:
+    """获取停止进程共用的线程池，首次调用时才创建，程序退出时关闭"""
+    global _stop_pool
+    if _stop_pool is None:
+        with _stop_pool_lock:
+            if _stop_pool is None:
+                _stop_pool = ThreadPoolExecutor(max_workers=_STOP_MAX_WORKERS, thread_name_prefix="process-stop")
+                atexit.register(_stop_pool.shutdown, wait=False)
+    return _stop_pool
+
 # --- 内部辅助类 ---
 
 class _ProcessManager:
@@ -64,16 +84,23 @@ class _ProcessManager:
 
     def stop_all(self):
         """停止所有由该管理器启动的进程。"""
-        # 创建一个pid列表的副本进行迭代，因为stop_process会修改running_processes列表
-        pids_to_stop = [info["process"].pid for info in self.running_processes if info.get("process")]
+        # 已自行退出的进程（如用户关闭了控制台窗口）无需再调用 taskkill，直接移出管理列表
+        self.running_processes = [
+            info for info in self.running_processes
+            if info.get("process") and info["process"].poll() is None
+        ]
+        processes_to_stop = list(self.running_processes)
         
-        if not pids_to_stop:
+        if not processes_to_stop:
             return
 
-        stopped_count = 0
-        for pid in pids_to_stop:
-            if self.stop_process(pid):
-                stopped_count += 1
+        # 每个进程的终止都要等待 taskkill/psutil 返回，并行执行使总耗时接近单个进程；
+        # 工作线程只负责终止，管理列表在全部完成后统一修改，避免多个线程同时遍历和删除
+        try:
+            stopped_count = sum(_get_stop_pool().map(self._terminate_process, processes_to_stop))
+        finally:
+            stopped_ids = {id(info) for info in processes_to_stop}
+            self.running_processes = [info for info in self.running_processes if id(info) not in stopped_ids]
         
         if stopped_count > 0:
             ui.print_info(f"已成功停止 {stopped_count} 个相关进程。")
@@ -85,10 +112,14 @@ class _ProcessManager:
         self.running_processes = [p for p in self.running_processes if p["process"].poll() is None]
         for info in self.running_processes:
             try:
-                p = psutil.Process(info["process"].pid)
+                # psutil.Process 只在首次获取时创建并随进程信息保存；poll() 确认子进程未退出，PID不会被复用
+                p = info.get("psutil_process")
+                if p is None:
+                    p = info["psutil_process"] = psutil.Process(info["process"].pid)
                 info["pid"] = p.pid
                 # CPU percent is now calculated in show_running_processes to avoid conflicts
-                info["memory_mb"] = p.memory_info().rss / (1024 * 1024)
+                # 保存原始字节数，显示时再换算为MB
+                info["memory_rss"] = p.memory_info().rss
                 info["running_time"] = time.time() - info["start_time"]
                 active_processes.append(info)
             except psutil.NoSuchProcess:
@@ -107,6 +138,16 @@ class _ProcessManager:
             logger.warning("尝试停止一个非托管进程", pid=pid)
             return False
 
+        try:
+            return self._terminate_process(process_info)
+        finally:
+            # 无论成功与否，都从管理列表中移除
+            if process_info in self.running_processes:
+                self.running_processes.remove(process_info)
+
+    def _terminate_process(self, process_info: Dict[str, Any]) -> bool:
+        """终止单个进程及其子进程，不修改管理列表，可在多个线程中并行调用。"""
+        pid = process_info["process"].pid
         title = process_info["title"]
         try:
             # 优先使用 taskkill (仅限Windows) 来确保终止整个进程树
@@ -149,10 +190,6 @@ class _ProcessManager:
             logger.error("终止进程时发生未知错误", pid=pid, title=title, error=str(e))
             ui.print_error(f"停止进程 '{title}' (PID: {pid}) 失败: {e}")
             return False
-        finally:
-            # 无论成功与否，都从管理列表中移除
-            if process_info in self.running_processes:
-                self.running_processes.remove(process_info)
         
         return True
 
@@ -860,8 +897,15 @@ class MaiLauncher:
                 del self._process_cache[pid]
         
         all_process_meta = [{"pid": os.getpid(), "title": "麦麦启动器 (主程序)"}]
+        # 托管进程的内存和运行时间刚由 get_running_processes_info 读取过，直接复用，不再重复查询
         for info in managed_procs_info:
-            all_process_meta.append({"pid": info["process"].pid, "title": info["title"], "start_time": info["start_time"]})
+            all_process_meta.append({
+                "pid": info["process"].pid,
+                "title": info["title"],
+                "start_time": info["start_time"],
+                "psutil_process": info["psutil_process"],
+                "memory_rss": info["memory_rss"],
+            })
 
         if not all_process_meta:
             ui.print_info("当前没有由本启动器启动的正在运行的进程。")
@@ -872,21 +916,25 @@ class MaiLauncher:
             try:
                 p = self._process_cache.get(pid)
                 if p is None:
-                    p = psutil.Process(pid)
-                    p.cpu_percent()  # 第一次调用返回0，但会初始化计时器
+                    p = meta.get("psutil_process") or psutil.Process(pid)
                     self._process_cache[pid] = p
-                    cpu_percent = 0.0
+                    is_new = True
                 else:
-                    cpu_percent = p.cpu_percent() # 后续调用将返回有意义的值
+                    is_new = False
                 
-                memory_mb = p.memory_info().rss / (1024 * 1024)
-                running_time = time.time() - (meta.get("start_time") or p.create_time())
+                # oneshot 内多个属性共用同一次 /proc 读取（Windows上为同一次系统调用）
+                with p.oneshot():
+                    cpu_percent = p.cpu_percent()
+                    if is_new:
+                        cpu_percent = 0.0  # 第一次调用返回0，但会初始化计时器
+                    memory_rss = meta["memory_rss"] if "memory_rss" in meta else p.memory_info().rss
+                    running_time = time.time() - (meta.get("start_time") or p.create_time())
 
                 table.add_row(
                     str(pid),
                     meta['title'],
                     f"{cpu_percent:.2f}",
-                    f"{memory_mb:.2f}",
+                    f"{memory_rss / (1024 * 1024):.2f}",
                     f"{int(running_time)}"
                 )
             except (psutil.NoSuchProcess, Exception) as e:
@@ -902,16 +950,18 @@ class MaiLauncher:
             p = psutil.Process(pid)
             managed_info = next((info for info in self._process_manager.running_processes if info.get("process") and info["process"].pid == pid), None)
             
-            details = {
-                "PID": p.pid,
-                "名称": p.name(),
-                "状态": p.status(),
-                "内存 (MB)": f"{p.memory_info().rss / (1024 * 1024):.2f}",
-                "启动时间": datetime.fromtimestamp(p.create_time()).strftime("%Y-%m-%d %H:%M:%S"),
-                "命令行": " ".join(p.cmdline()),
-                "工作目录": p.cwd(),
-                "父进程ID": p.ppid(),
-            }
+            # 多个属性在 oneshot 内共用同一次进程信息读取
+            with p.oneshot():
+                details = {
+                    "PID": p.pid,
+                    "名称": p.name(),
+                    "状态": p.status(),
+                    "内存 (MB)": f"{p.memory_info().rss / (1024 * 1024):.2f}",
+                    "启动时间": datetime.fromtimestamp(p.create_time()).strftime("%Y-%m-%d %H:%M:%S"),
+                    "命令行": " ".join(p.cmdline()),
+                    "工作目录": p.cwd(),
+                    "父进程ID": p.ppid(),
+                }
             if managed_info:
                 details["托管标题"] = managed_info["title"]
 
@@ -7,6 +7,10 @@ import sys
 import ctypes
 import subprocess
 import re
+import shutil
+import threading
+import time
+import psutil
 import structlog
 from typing import Optional, Tuple
 
@@ -106,6 +110,59 @@ def validate_exe_path(path: str) -> Tuple[bool, str]:
     return True, ""
 
 
+# Windows 上目标文件被其他进程（编辑器、杀毒软件）打开时替换会暂时失败，重试的次数和间隔
+_REPLACE_RETRIES = 5
+_REPLACE_RETRY_DELAY = 0.1
+
+
+def write_text_atomic(path: str, content: str, encoding: str = "utf-8") -> None:
+    """
+    原子地写入文本文件：先写入同目录下的临时文件，再替换目标文件
+    
+    写入中途出错或进程崩溃时目标文件保持原样，不会留下只写了一半的配置。
+    目标文件是符号链接时写入其指向的文件；目标文件被占用、多次重试仍无法替换时
+    退回直接覆盖写入
+    
+    Args:
+        path: 目标文件路径
+        content: 文件内容
+        encoding: 文件编码
+    """
+    # 解析符号链接，替换的是链接指向的文件而不是链接本身
+    path = os.path.realpath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 临时文件名按进程和线程区分；用 "x" 模式创建，权限与普通新建文件一致（受umask控制）
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        f = open(temp_path, "x", encoding=encoding)
+    except FileExistsError:
+        # 上次崩溃遗留的同名临时文件
+        os.remove(temp_path)
+        f = open(temp_path, "x", encoding=encoding)
+    try:
+        with f:
+            f.write(content)
+        # 目标文件已存在时沿用其权限
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        for attempt in range(_REPLACE_RETRIES):
+            try:
+                os.replace(temp_path, path)
+                return
+            except PermissionError:
+                if attempt < _REPLACE_RETRIES - 1:
+                    time.sleep(_REPLACE_RETRY_DELAY)
+        # 仍被占用时按原来的方式直接覆盖写入，保证保存不会因此失败
+        logger.warning("无法替换目标文件，改为直接写入", path=path)
+        with open(path, "w", encoding=encoding) as target:
+            target.write(content)
+        os.remove(temp_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
 def check_process(process_name: str) -> bool:
     """
     检查进程是否正在运行
@@ -117,13 +174,12 @@ def check_process(process_name: str) -> bool:
         进程是否正在运行
     """
     try:
-        result = subprocess.run(
-            ["tasklist", "/FI", f"IMAGENAME eq {process_name}"],
-            capture_output=True,
-            text=True,
-            check=True
+        # 只请求进程名，psutil 一次批量读取，无需启动 tasklist 子进程；找到即停止遍历
+        target = process_name.lower()
+        return any(
+            (proc.info["name"] or "").lower() == target
+            for proc in psutil.process_iter(["name"])
         )
-        return process_name.lower() in result.stdout.lower()
     except Exception as e:
         logger.warning("检查进程失败", process=process_name, error=str(e))
         return False